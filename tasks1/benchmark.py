@@ -0,0 +1,377 @@
+"""
+Gambler's Ruin Problem - Benchmark Suite
+
+Times every public function of gambler_ruin over a grid of total capital
+a + b (10 to 10,000), pA (0.2 to 0.8) and batch sizes, plus the exact
+workloads of the task scripts (task_a to task_f) as named scenarios.
+
+For every scenario it reports games/sec, rounds/sec, p50/p99 latency per
+call (a single game for simulate_game, a whole batch for the batch
+functions) and peak memory (tracemalloc), saves the results as JSON and
+can compare them against a stored baseline, failing on regressions beyond
+the threshold and the run-to-run noise.
+
+Usage (from tasks1/):
+    python -m benchmark                          # full grid
+    python -m benchmark --quick                  # small grid for CI
+    python -m benchmark --filter task_           # only the task workloads
+    python -m benchmark --baseline base.json --threshold 0.2
+    python -m benchmark --output base.json       # store a new baseline
+
+Without --output the results go to benchmarks/tasks1/latest.json at the
+repository root, which is ignored by git: timings are machine specific,
+so no baseline is committed; keep one per machine with --output.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+import gambler_ruin as gr
+from simulation_cache import SimulationCache
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(script_dir)
+DEFAULT_OUTPUT = os.path.join(repo_root, 'benchmarks', 'tasks1', 'latest.json')
+
+TOTALS = [10, 100, 1000, 10000]
+PA_VALUES = [0.2, 0.35, 0.5, 0.65, 0.8]
+BATCH_SIZES = [1, 100, 10000]
+QUICK_TOTALS = [10, 100]
+QUICK_PA_VALUES = [0.2, 0.5, 0.8]
+QUICK_BATCH_SIZES = [1, 1000]
+
+# Timed calls continue past a scenario's `repeat` until MIN_TIMED_S has
+# elapsed (at most MAX_TIMED_CALLS per pass), so fast calls get enough
+# samples for stable minima and percentiles
+MIN_TIMED_S = 0.3
+MAX_TIMED_CALLS = 1000
+PASSES = 3
+# Call times below this are dominated by timer and scheduler noise and are
+# never reported as regressions
+NOISE_FLOOR_S = 1e-3
+
+# Grid points whose expected work (games x rounds per game) exceeds this are skipped
+MAX_WORK = 2e7
+MAX_ROUNDS = 100000
+
+
+class Scenario:
+    """
+    One benchmarked call.
+
+    run() performs the work; games is the number of games (or parameter
+    points) handled per call, and rounds, if given, maps the result of run()
+    to the number of rounds it simulated.
+    """
+
+    def __init__(self, name: str, run: Callable, games: int, rounds: Optional[Callable] = None,
+                 repeat: int = 5):
+        self.name = name
+        self.run = run
+        self.games = games
+        self.rounds = rounds
+        self.repeat = repeat
+
+
+def _sweep_rounds(rows: List[Dict]) -> int:
+    """Total rounds simulated by a simulate_sweep call."""
+    return sum(round(row['avg_rounds_sim'] * row['num_simulations']) for row in rows)
+
+
+def _expected_rounds(a: int, b: int, pA: float) -> float:
+    """Expected game duration, capped at MAX_ROUNDS."""
+    return min(gr.theoretical_expected_rounds(a, b, pA), MAX_ROUNDS)
+
+
+def _survival_supported(a: int, b: int, pA: float, n: np.ndarray) -> bool:
+    """
+    False if theoretical_survival refuses these n (strongly biased large games
+    whose exact fallback sweep would exceed SURVIVAL_MAX_SWEEP). Only queries
+    that could hit the limit are tried.
+    """
+    if (a + b + 1) * int(n.max()) <= gr.SURVIVAL_MAX_SWEEP:
+        return True
+    try:
+        gr.theoretical_survival(a, b, pA, n)
+    except ValueError:
+        return False
+    return True
+
+
+def grid_scenarios(totals: List[int], pA_values: List[float], batch_sizes: List[int]) -> List[Scenario]:
+    """Scenarios for every public function over the (a + b, pA, batch size) grid."""
+    scenarios = []
+    for total in totals:
+        a = total // 2
+        b = total - a
+        for pA in pA_values:
+            point = f"N={total},pA={pA}"
+            expected = _expected_rounds(a, b, pA)
+
+            # Analytical functions: one call per point
+            scenarios += [
+                Scenario(f"theoretical_duration_moments[{point}]",
+                         lambda a=a, b=b, pA=pA: gr.theoretical_duration_moments(a, b, pA), 1),
+                Scenario(f"theoretical_P_ruin_A[{point}]",
+                         lambda a=a, b=b, pA=pA: gr.theoretical_P_ruin_A(a, b, pA), 1),
+                Scenario(f"theoretical_expected_rounds[{point}]",
+                         lambda a=a, b=b, pA=pA: gr.theoretical_expected_rounds(a, b, pA), 1),
+                Scenario(f"theoretical_variance_rounds[{point}]",
+                         lambda a=a, b=b, pA=pA: gr.theoretical_variance_rounds(a, b, pA), 1),
+            ]
+            if _survival_supported(a, b, pA, np.arange(0, 10 * total, total)):
+                scenarios.append(Scenario(f"theoretical_survival[{point}]",
+                                          lambda a=a, b=b, pA=pA, total=total:
+                                          gr.theoretical_survival(a, b, pA, np.arange(0, 10 * total, total)), 1))
+            if total <= 1000:
+                horizon = int(min(4 * expected, 20000))
+                scenarios += [
+                    Scenario(f"theoretical_duration_distribution[{point}]",
+                             lambda a=a, b=b, pA=pA, horizon=horizon:
+                             gr.theoretical_duration_distribution(a, b, pA, horizon), 1, repeat=3),
+                    Scenario(f"theoretical_LMAX[{point}]",
+                             lambda a=a, b=b, pA=pA: gr.theoretical_LMAX(a, b, pA, 1000), 1, repeat=3),
+                    Scenario(f"theoretical_capital_distribution[{point}]",
+                             lambda a=a, b=b, pA=pA, horizon=horizon:
+                             gr.theoretical_capital_distribution(a, b, pA, [1, horizon // 2, horizon]),
+                             1, repeat=3),
+                ]
+
+            # Single-game functions
+            if expected <= MAX_WORK / 100:
+                scenarios += [
+                    Scenario(f"simulate_game[{point}]",
+                             lambda a=a, b=b, pA=pA: gr.simulate_game(a, b, pA), 1,
+                             rounds=lambda result: result[1], repeat=20),
+                    Scenario(f"simulate_game_with_wins[{point}]",
+                             lambda a=a, b=b, pA=pA: gr.simulate_game_with_wins(a, b, pA), 1,
+                             rounds=lambda result: result[1], repeat=20),
+                ]
+
+            # Batch functions
+            for games in batch_sizes:
+                if games * expected > MAX_WORK:
+                    continue
+                batch = f"{point},n={games}"
+                scenarios += [
+                    Scenario(f"simulate_multiple_games[{batch}]",
+                             lambda a=a, b=b, pA=pA, games=games: gr.simulate_multiple_games(a, b, pA, games),
+                             games, rounds=lambda result: int(np.sum(result['num_rounds']))),
+                    Scenario(f"simulate_multiple_games_stream[{batch}]",
+                             lambda a=a, b=b, pA=pA, games=games:
+                             gr.simulate_multiple_games(a, b, pA, games, stream=True),
+                             games, rounds=lambda result: round(result['stats'].mean * result['stats'].count)),
+                    Scenario(f"simulate_capital_after_N_rounds[{batch}]",
+                             lambda a=a, b=b, pA=pA, games=games, total=total:
+                             gr.simulate_capital_after_N_rounds(a, b, pA, total, games), games),
+                    Scenario(f"simulate_sweep[{batch}]",
+                             lambda a=a, b=b, pA=pA, games=games: gr.simulate_sweep(a, b, [pA, 1 - pA], games),
+                             2 * games, rounds=_sweep_rounds),
+                ]
+                if games > 1:
+                    scenarios.append(
+                        Scenario(f"simulate_ruin_importance_sampling[{batch}]",
+                                 lambda a=a, b=b, pA=pA, games=games:
+                                 gr.simulate_ruin_importance_sampling(a, b, pA, games), games))
+
+            if total <= 100:
+                scenarios.append(
+                    Scenario(f"simulate_until_precision[{point}]",
+                             lambda a=a, b=b, pA=pA: gr.simulate_until_precision(a, b, pA, abs_tol=0.02), 1,
+                             rounds=lambda result: round(result['avg_rounds'] * result['num_games']), repeat=3))
+
+    scenarios += [
+        Scenario("wilson_interval", lambda: gr.wilson_interval(4321, 10000), 1, repeat=100),
+        Scenario("clopper_pearson_interval", lambda: gr.clopper_pearson_interval(4321, 10000), 1, repeat=20),
+    ]
+    return scenarios
+
+
+# Workloads of the task scripts: compute() of each on a fresh
+# SimulationCache with a fixed seed, so every call does exactly the work of
+# the task (without report or plot), and keeps doing so as the tasks change
+
+TASK_GAMES = {
+    'a': 5,  # Parameter points (games per point depend on the stopping rule)
+    'b': 9,
+    'c': 3 * 10000,
+    'd': 3 * (3 + 2000),  # Plotted trajectories plus band games per pA
+    'e': 7 * 1000,
+    'f': 6  # N values (exact, no games)
+}
+TASK_REPEAT = {'d': 5, 'f': 10}
+
+
+def _task(name: str, seed: int) -> int:
+    """Run compute() of task_<name> and return the number of rounds it simulated."""
+    task = importlib.import_module(f'task_{name}')
+    with gr.instrument() as inst:
+        task.compute(SimulationCache(seed))
+    return inst.counters['rounds']
+
+
+def task_scenarios(seed: int = 0) -> List[Scenario]:
+    """The exact workload of each task script as one named scenario."""
+    return [Scenario(f'task_{name}', lambda name=name: _task(name, seed), games, rounds=int,
+                     repeat=TASK_REPEAT.get(name, 3))
+            for name, games in TASK_GAMES.items()]
+
+
+def _time_calls(scenario: Scenario, calls: int, budget: float) -> Tuple[List[float], int]:
+    """Time at least `calls` calls of a scenario, more until `budget` seconds have elapsed."""
+    times = []
+    rounds = 0
+    while len(times) < calls or (sum(times) < budget and len(times) < MAX_TIMED_CALLS):
+        start = time.perf_counter()
+        result = scenario.run()
+        times.append(time.perf_counter() - start)
+        if scenario.rounds is not None:
+            rounds += scenario.rounds(result)
+    return times, rounds
+
+
+def run_scenarios(scenarios: List[Scenario], seed: int = 0, passes: int = PASSES) -> List[Dict]:
+    """
+    Time scenarios: one warm-up call each, then `passes` interleaved passes
+    over all of them, each timing a share of `repeat` calls (more until its
+    share of MIN_TIMED_S has elapsed), so a slow spell of the machine hits
+    every scenario alike rather than a few of them. Finally one call under
+    tracemalloc for the peak memory (kept separate so tracing does not slow
+    down the timed calls). Latencies are percentiles of the individual call
+    times.
+    """
+    for scenario in scenarios:
+        np.random.seed(seed)
+        scenario.run()
+
+    times = {scenario.name: [] for scenario in scenarios}
+    rounds = dict.fromkeys(times, 0)
+    for _ in range(passes):
+        for scenario in scenarios:
+            # Same seed in every pass and run, so randomly sized workloads repeat
+            np.random.seed(seed)
+            calls, simulated = _time_calls(scenario, -(-scenario.repeat // passes), MIN_TIMED_S / passes)
+            times[scenario.name] += calls
+            rounds[scenario.name] += simulated
+
+    results = []
+    for scenario in scenarios:
+        tracemalloc.start()
+        try:
+            scenario.run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        calls = np.array(times[scenario.name])
+        total_time = calls.sum()
+        p10, p90 = np.percentile(calls, [10, 90])
+        results.append({
+            'name': scenario.name,
+            'games_per_call': scenario.games,
+            'calls': calls.size,
+            'min_call_s': float(calls.min()),
+            'spread_call_s': float(p90 - p10),
+            'games_per_sec': scenario.games * calls.size / total_time,
+            'rounds_per_sec': rounds[scenario.name] / total_time if rounds[scenario.name] else None,
+            'call_p50_s': float(np.percentile(calls, 50)),
+            'call_p99_s': float(np.percentile(calls, 99)),
+            'peak_memory_bytes': int(peak)
+        })
+    return results
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    """
+    Compare results with a baseline run.
+
+    A scenario regresses if its peak memory grew by more than `threshold`
+    (relative), or if its fastest call slowed down by more than `threshold`
+    and by more than the spread (10th to 90th percentile) of the call times
+    in either run. Calls faster than NOISE_FLOOR_S in the baseline are not
+    timed against it. Scenarios missing from either run are ignored.
+    """
+    previous = {row['name']: row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(row['name'])
+        if old is None:
+            continue
+        slowdown = row['min_call_s'] - old['min_call_s']
+        if (old['min_call_s'] >= NOISE_FLOOR_S and slowdown > threshold * old['min_call_s']
+                and slowdown > max(old['spread_call_s'], row['spread_call_s'])):
+            regressions.append(f"{row['name']}: min_call_s {old['min_call_s']:.4g} -> {row['min_call_s']:.4g} "
+                               f"(+{slowdown / old['min_call_s'] * 100:.1f}%)")
+        key = 'peak_memory_bytes'
+        if old[key] > 0 and row[key] > old[key] * (1 + threshold):
+            regressions.append(f"{row['name']}: {key} {old[key]:.4g} -> {row[key]:.4g} "
+                               f"(+{(row[key] / old[key] - 1) * 100:.1f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the gambler_ruin module.")
+    parser.add_argument('--quick', action='store_true', help="use the small grid")
+    parser.add_argument('--filter', default='', help="only run scenarios whose name contains this string")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="where to save the JSON results")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed relative slowdown / memory growth before failing (default 0.10)")
+    parser.add_argument('--backend', help="simulation backend to benchmark (see gambler_ruin.get_backend)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.backend is not None:
+        gr.get_backend(args.backend)
+        os.environ[gr.BACKEND_ENV_VAR] = args.backend
+
+    if args.quick:
+        scenarios = grid_scenarios(QUICK_TOTALS, QUICK_PA_VALUES, QUICK_BATCH_SIZES)
+    else:
+        scenarios = grid_scenarios(TOTALS, PA_VALUES, BATCH_SIZES)
+    scenarios += task_scenarios(args.seed)
+    scenarios = [scenario for scenario in scenarios if args.filter in scenario.name]
+
+    print(f"{'scenario':<62} {'games/s':>11} {'rounds/s':>11} {'call p50':>10} {'call p99':>10} {'peak MB':>9}")
+    results = run_scenarios(scenarios, args.seed)
+    for row in results:
+        rounds_per_sec = f"{row['rounds_per_sec']:>11.3g}" if row['rounds_per_sec'] else f"{'-':>11}"
+        print(f"{row['name']:<62} {row['games_per_sec']:>11.3g} {rounds_per_sec} "
+              f"{row['call_p50_s']:>10.2e} {row['call_p99_s']:>10.2e} "
+              f"{row['peak_memory_bytes'] / 2**20:>9.2f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'backend': gr.get_backend().name,
+            'quick': args.quick,
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults saved to '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%} against '{args.baseline}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
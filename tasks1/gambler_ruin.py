@@ -3,11 +3,406 @@ Gambler's Ruin Problem - Base Module
 Contains simulation functions and theoretical formulas
 """
 
+import os
+import math
+import time
+import json
+import atexit
+import pickle
+import functools
+import marshal
+import cProfile
+import contextlib
+import importlib.util
+import multiprocessing
 import numpy as np
-from typing import Tuple, List, Dict
+from fractions import Fraction
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, List, Dict, Optional, Callable
 
+# Numba is only imported when a kernel is first compiled (importing it takes
+# longer than the rest of this module)
+_NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
 
-def simulate_game(a: int, b: int, pA: float, max_rounds: int = 100000) -> Tuple[bool, int, List[int]]:
+
+class Instrumentation:
+    """
+    Counters and phase timings collected while instrumentation is enabled
+    (see instrument).
+    
+    counters:
+        - games: Games simulated
+        - rounds: Rounds stepped, summed over games
+        - rng_draws: Random variates drawn: uniform doubles, or 64-bit words
+          of raw bits for kernels using a StepSource
+        - truncated: Games stopped at max_rounds before anyone was ruined;
+          they count as not ruined, which biases P_ruin_A downwards
+    phases:
+        name -> {'calls', 'wall_s', 'cpu_s'} for every phase() block
+    
+    Simulation kernels update the counters once per call, so disabled
+    instrumentation costs a single global lookup per kernel call.
+    """
+    
+    COUNTERS = ('games', 'rounds', 'rng_draws', 'truncated')
+    
+    def __init__(self, profile: bool = False):
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.phases: Dict[str, Dict] = {}
+        self.profiler = cProfile.Profile() if profile else None
+    
+    def count(self, **counts) -> None:
+        for name, value in counts.items():
+            self.counters[name] += int(value)
+    
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time a block of work (wall and CPU) under the given phase name."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            timing['calls'] += 1
+            timing['wall_s'] += time.perf_counter() - wall
+            timing['cpu_s'] += time.process_time() - cpu
+    
+    def merge(self, other: 'Instrumentation') -> None:
+        """Add the counters and phase timings of another Instrumentation."""
+        self.count(**other.counters)
+        for name, other_timing in other.phases.items():
+            timing = self.phases.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            for key in timing:
+                timing[key] += other_timing[key]
+    
+    def report(self) -> Dict:
+        """Counters and phases as a JSON-serializable dict."""
+        games = self.counters['games']
+        return {
+            'counters': dict(self.counters),
+            'truncated_fraction': self.counters['truncated'] / games if games else 0.0,
+            'phases': {name: dict(timing) for name, timing in self.phases.items()}
+        }
+    
+    def write_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+    
+    def dump_stats(self, path: str) -> None:
+        """
+        Write a cProfile-compatible stats file (load with pstats.Stats(path)).
+        
+        Phases appear as pseudo-functions '<phase>:0(name)'; with
+        profile=True the full cProfile data of the instrumented block is
+        included as well.
+        """
+        stats = {}
+        if self.profiler is not None:
+            self.profiler.create_stats()
+            stats.update(self.profiler.stats)
+        for name, timing in self.phases.items():
+            stats[('<phase>', 0, name)] = (timing['calls'], timing['calls'], timing['wall_s'], timing['wall_s'], {})
+        with open(path, 'wb') as f:
+            marshal.dump(stats, f)
+
+
+# Active Instrumentation, or None when instrumentation is disabled
+_instrumentation: Optional[Instrumentation] = None
+
+INSTRUMENT_ENV_VAR = 'GAMBLER_RUIN_INSTRUMENT'
+
+
+@contextlib.contextmanager
+def instrument(profile: bool = False):
+    """
+    Enable instrumentation for the enclosed block and yield its Instrumentation.
+    
+    With profile=True the block also runs under cProfile. Nested blocks add
+    their results to the enclosing one when they exit.
+    
+    Example:
+        with instrument() as inst:
+            simulate_multiple_games(50, 50, 0.5)
+        print(inst.report()['counters'])
+    """
+    global _instrumentation
+    previous = _instrumentation
+    current = Instrumentation(profile)
+    _instrumentation = current
+    if current.profiler is not None:
+        current.profiler.enable()
+    try:
+        yield current
+    finally:
+        if current.profiler is not None:
+            current.profiler.disable()
+        _instrumentation = previous
+        if previous is not None:
+            previous.merge(current)
+
+
+def phase(name: str):
+    """Time a block under the active Instrumentation (a no-op when disabled)."""
+    if _instrumentation is None:
+        return contextlib.nullcontext()
+    return _instrumentation.phase(name)
+
+
+def _instrument_from_env() -> None:
+    """
+    Enable instrumentation for the whole process when GAMBLER_RUIN_INSTRUMENT
+    names a report path (e.g. for the task scripts). The JSON report is
+    written there at exit, with cProfile-compatible phase stats next to it
+    (same name, .prof extension).
+    """
+    global _instrumentation
+    path = os.environ.get(INSTRUMENT_ENV_VAR)
+    if not path or multiprocessing.parent_process() is not None:
+        return
+    _instrumentation = Instrumentation()
+    
+    def write_reports(instrumentation=_instrumentation):
+        instrumentation.write_json(path)
+        instrumentation.dump_stats(os.path.splitext(path)[0] + '.prof')
+    atexit.register(write_reports)
+
+
+_instrument_from_env()
+
+
+class Trajectory:
+    """
+    Compact trajectory of a single game.
+    
+    Stores the round outcomes packed 1 bit per round (np.packbits) plus A's
+    starting capital. A's capital and cumulative wins are rebuilt lazily as
+    small-int NumPy arrays when the trajectory is indexed, iterated or passed
+    to NumPy/matplotlib, so thousands of trajectories can be kept in memory.
+    
+    series selects what indexing returns: 'capital' or 'wins'. as_wins() and
+    as_capital() return views that share the same packed bits.
+    """
+    
+    __slots__ = ('start', 'num_rounds', 'series', '_bits')
+    
+    def __init__(self, bits: np.ndarray, num_rounds: int, start: int, series: str = 'capital'):
+        if series not in ('capital', 'wins'):
+            raise ValueError(f"series must be 'capital' or 'wins', got {series!r}")
+        self._bits = bits
+        self.num_rounds = num_rounds
+        self.start = start
+        self.series = series
+    
+    @classmethod
+    def from_rounds(cls, A_won_round: np.ndarray, start: int, series: str = 'capital') -> 'Trajectory':
+        """Build a trajectory from a boolean array (True where A won the round)."""
+        return cls(np.packbits(A_won_round), len(A_won_round), start, series)
+    
+    @property
+    def A_won_round(self) -> np.ndarray:
+        """Boolean array, True where A won the round."""
+        return np.unpackbits(self._bits, count=self.num_rounds).astype(bool)
+    
+    @property
+    def wins(self) -> np.ndarray:
+        """Cumulative wins of A after each round (starting with 0)."""
+        wins = np.zeros(self.num_rounds + 1, dtype=np.min_scalar_type(self.num_rounds))
+        np.cumsum(np.unpackbits(self._bits, count=self.num_rounds), out=wins[1:])
+        return wins
+    
+    @property
+    def capital(self) -> np.ndarray:
+        """A's capital after each round (starting with the initial capital)."""
+        capital = self.start + 2 * self.wins.astype(np.int64) - np.arange(self.num_rounds + 1)
+        return capital.astype(np.min_scalar_type(self.start + self.num_rounds))
+    
+    @property
+    def values(self) -> np.ndarray:
+        """The selected series (capital or wins) as a NumPy array."""
+        return self.capital if self.series == 'capital' else self.wins
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the packed round outcomes."""
+        return self._bits.nbytes
+    
+    def as_wins(self) -> 'Trajectory':
+        return Trajectory(self._bits, self.num_rounds, self.start, 'wins')
+    
+    def as_capital(self) -> 'Trajectory':
+        return Trajectory(self._bits, self.num_rounds, self.start, 'capital')
+    
+    def __len__(self) -> int:
+        return self.num_rounds + 1
+    
+    def __getitem__(self, index):
+        return self.values[index]
+    
+    def __iter__(self):
+        return iter(self.values.tolist())
+    
+    def __array__(self, dtype=None, copy=None):
+        values = self.values
+        return values if dtype is None else values.astype(dtype)
+    
+    def __repr__(self) -> str:
+        return f"Trajectory(start={self.start}, num_rounds={self.num_rounds}, series={self.series!r})"
+
+
+@functools.lru_cache(maxsize=256)
+def _step_plan(pA: float) -> Tuple[Optional[int], int, Optional[int], int]:
+    """(field_bits, threshold, top_byte, low_bits) of StepSource for pA; None where the path does not apply."""
+    fraction = Fraction(pA)
+    if 0 < fraction < 1 and fraction.denominator <= 1 << 16:
+        w = fraction.denominator.bit_length() - 1
+        field_bits = next(width for width in (1, 2, 4, 8, 16) if width >= w)
+        return field_bits, fraction.numerator << (field_bits - w), None, 0
+    if 0 < fraction < 1 and (fraction * (1 << 64)).denominator == 1:
+        T = int(fraction * (1 << 64))
+        return None, 0, T >> 56, T & ((1 << 56) - 1)
+    return None, 0, None, 0
+
+
+class StepSource:
+    """
+    Round outcomes (True where A wins, probability pA) drawn from raw random
+    bits instead of one 53-bit double per round.
+    
+    - Dyadic pA = t / 2^w (w <= 16, e.g. 0.5, 0.25, 0.8125): every draw is a
+      w'-bit field of the raw words (w' the next of 1, 2, 4, 8, 16), won iff
+      field < t * 2^(w' - w). pA = 0.5 uses every bit: 64 rounds per uint64.
+    - Any other pA >= 2^-11: pA * 2^64 is an integer T. A round compares one
+      random byte with the top byte of T and is decided unless they are
+      equal (probability 1/256); ties compare 56 more random bits with the
+      rest of T. P(win) = T / 2^64 = pA exactly, at about 8.25 bits per round.
+    - pA < 2^-11 (T is not an integer): one double per round, as before.
+    
+    pA = 0 and 1 need no randomness. rng is a np.random.Generator or the
+    np.random module; only raw bits are used (bit_generator.random_raw, or
+    rng.bytes), so results are reproducible from a seed. Outcomes are
+    decoded ahead into a buffer that doubles with use (up to BUFFER_ROUNDS),
+    so the many small draws of a lockstep loop cost few RNG calls while a
+    single short game decodes little more than it uses. words counts the
+    64-bit words of randomness consumed.
+    """
+    
+    BUFFER_ROUNDS = 1 << 16
+    
+    def __init__(self, pA: float, rng=None):
+        self.pA = float(pA)
+        self.rng = np.random if rng is None else rng
+        self.words = 0
+        self._buffer = np.zeros(0, dtype=bool)
+        self._position = 0
+        self._drawn = 0
+        self.field_bits, self.threshold, self.top_byte, self.low_bits = _step_plan(self.pA)
+    
+    def _bytes(self, count: int) -> np.ndarray:
+        """count random bytes, whole 64-bit words straight from the bit generator where there is one."""
+        words = -(-count // 8)
+        self.words += words
+        if isinstance(self.rng, np.random.Generator):
+            return self.rng.bit_generator.random_raw(words).view(np.uint8)
+        return np.frombuffer(self.rng.bytes(8 * words), dtype=np.uint8)
+    
+    def draw(self, shape) -> np.ndarray:
+        """Boolean array of the given shape, True where A wins the round."""
+        size = math.prod(shape) if isinstance(shape, tuple) else int(shape)
+        if self.pA <= 0 or self.pA >= 1:
+            return np.full(shape, self.pA >= 1)
+        
+        self._drawn += size
+        if self._position + size > self._buffer.size:
+            fresh = self._decode(max(size, min(self._drawn, self.BUFFER_ROUNDS)))
+            self._buffer = np.concatenate([self._buffer[self._position:], fresh])
+            self._position = 0
+        won = self._buffer[self._position:self._position + size]
+        self._position += size
+        return won.reshape(shape)
+    
+    def _decode(self, size: int) -> np.ndarray:
+        """size fresh outcomes straight from the random bits."""
+        if self.field_bits is not None:
+            if self.field_bits == 1:
+                return np.unpackbits(self._bytes(-(-size // 8)))[:size] < self.threshold
+            if self.field_bits == 16:
+                return self._bytes(2 * size).view(np.uint16)[:size] < self.threshold
+            # Several fields per byte, compared one field position at a time
+            per_byte = 8 // self.field_bits
+            raw = self._bytes(-(-size // per_byte))
+            won = np.empty((raw.size, per_byte), dtype=bool)
+            mask = (1 << self.field_bits) - 1
+            for j in range(per_byte):
+                np.less((raw >> (j * self.field_bits)) & mask, self.threshold, out=won[:, j])
+            return won.ravel()[:size]
+        
+        if self.top_byte is not None:
+            first = self._bytes(size)[:size]
+            won = first < self.top_byte
+            tie = np.flatnonzero(first == self.top_byte)
+            if tie.size > 0:
+                rest = self._bytes(8 * tie.size).view(np.uint64) >> np.uint64(8)
+                won[tie] = rest < np.uint64(self.low_bits)
+            return won
+        
+        self.words += size
+        return self.rng.random(size) < self.pA
+
+
+def _simulate_game_steps(a: int, b: int, pA: float, max_rounds: int = 100000,
+                         rng=None) -> Tuple[bool, int, np.ndarray]:
+    """
+    Simulate a single game by drawing its rounds in blocks.
+    
+    Each block of outcomes is turned into a capital path with a cumulative
+    sum, and the first round where the path reaches 0 or a+b is found with
+    vectorized comparisons. A new (twice as large) block is drawn only if the
+    current one does not end the game; the first block is sized from the
+    expected duration so most games need a single draw. Outcomes come from a
+    StepSource (several rounds per random word).
+    
+    Returns:
+    --------
+    Tuple[bool, int, np.ndarray]
+        (A_wins, num_rounds, A_won_round)
+        - A_won_round: Boolean array, True where A won the round
+    """
+    steps = StepSource(pA, rng)
+    total = a + b
+    capital = a
+    rounds = 0
+    blocks = []
+    
+    # Rough expected duration: a*b for a fair game, distance / drift otherwise
+    drift = abs(2 * pA - 1)
+    expected = a * b if drift < 1e-3 else (b if pA > 0.5 else a) / drift
+    block_size = int(min(max(1.25 * expected, 64), 1 << 16))
+    
+    while 0 < capital < total and rounds < max_rounds:
+        size = min(block_size, max_rounds - rounds)
+        won = steps.draw(size)
+        path = capital + np.cumsum(np.where(won, 1, -1))
+        
+        hit = (path <= 0) | (path >= total)
+        if hit.any():
+            end = int(np.argmax(hit)) + 1
+        else:
+            end = size
+        
+        blocks.append(won[:end])
+        capital = int(path[end - 1])
+        rounds += end
+        block_size = min(2 * block_size, 1 << 20)
+    
+    won = np.concatenate(blocks) if blocks else np.zeros(0, dtype=bool)
+    if _instrumentation is not None:
+        _instrumentation.count(games=1, rounds=rounds, rng_draws=steps.words, truncated=0 < capital < total)
+    return capital > 0, rounds, won
+
+
+def simulate_game(a: int, b: int, pA: float, max_rounds: int = 100000,
+                  compact: bool = False, backend: Optional[str] = None) -> Tuple[bool, int, List[int]]:
     """
     Simulate a single Gambler's Ruin game.
     
@@ -21,6 +416,10 @@ def simulate_game(a: int, b: int, pA: float, max_rounds: int = 100000) -> Tuple[
         Probability that player A wins a single round
     max_rounds : int
         Maximum number of rounds to prevent infinite loops
+    compact : bool
+        Return capital_history as a Trajectory (1 bit per round) instead of a list
+    backend : str, optional
+        Simulation backend (see get_backend)
     
     Returns:
     --------
@@ -30,173 +429,2126 @@ def simulate_game(a: int, b: int, pA: float, max_rounds: int = 100000) -> Tuple[
         - num_rounds: Number of rounds until game ends
         - capital_history: List of A's capital after each round
     """
-    capital_A = a
-    capital_B = b
-    rounds = 0
-    capital_history = [capital_A]
-    
-    while capital_A > 0 and capital_B > 0 and rounds < max_rounds:
-        if np.random.random() < pA:
-            capital_A += 1
-            capital_B -= 1
-        else:
-            capital_A -= 1
-            capital_B += 1
-        
-        rounds += 1
-        capital_history.append(capital_A)
-    
-    A_wins = (capital_A > 0)
+    A_wins, rounds, won = get_backend(backend).game_steps(a, b, pA, max_rounds)
+    if compact:
+        return A_wins, rounds, Trajectory.from_rounds(won, a)
+    capital_history = (a + np.concatenate(([0], np.cumsum(np.where(won, 1, -1))))).tolist()
     return A_wins, rounds, capital_history
 
 
-def simulate_multiple_games(a: int, b: int, pA: float, num_simulations: int = 10000) -> Dict:
+def _simulate_batch(a, b, pA, num_simulations: int,
+                    max_rounds: int = 100000, rng=None,
+                    uniform_stream: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Run multiple simulations and collect statistics.
+    Simulate many games in lockstep, advancing every unfinished game by one
+    round per iteration. Games leave the active set as soon as they are
+    absorbed, so each iteration only touches games that are still running.
+    
+    a, b and pA may be scalars or arrays of length num_simulations, giving
+    every game (lane) its own boundaries and win probability.
+    rng is a np.random.Generator; None uses the global np.random state.
+    
+    uniform_stream optionally maps every lane to a shared stream of uniforms:
+    lanes with the same stream index see the same U in every round (common
+    random numbers).
+    
+    With a scalar pA and no uniform_stream, outcomes come from a StepSource;
+    per-lane pA and common random numbers need one uniform per lane and round.
     
     Returns:
     --------
-    Dict with keys:
-        - A_wins: List of booleans (True if A won)
-        - num_rounds: List of round counts
-        - P_ruin_A: Probability that A goes bankrupt
-        - avg_rounds: Average number of rounds
+    Tuple[np.ndarray, np.ndarray]
+        (final_capital, num_rounds)
+        - final_capital: A's capital when the game ended (or at max_rounds)
+        - num_rounds: Number of rounds played in each game
     """
-    A_wins_list = []
-    num_rounds_list = []
+    rng = np.random if rng is None else rng
+    step_source = StepSource(pA, rng) if np.ndim(pA) == 0 and uniform_stream is None else None
+    a = np.broadcast_to(np.asarray(a, dtype=np.int64), (num_simulations,))
+    total = np.broadcast_to(a + np.asarray(b, dtype=np.int64), (num_simulations,))
+    pA = np.broadcast_to(np.asarray(pA, dtype=float), (num_simulations,))
+    final_capital = a.copy()
+    num_rounds = np.zeros(num_simulations, dtype=np.int64)
     
-    for _ in range(num_simulations):
-        A_wins, rounds, _ = simulate_game(a, b, pA)
-        A_wins_list.append(A_wins)
-        num_rounds_list.append(rounds)
+    # Compact views of the games that are still running
+    active = np.flatnonzero((a > 0) & (a < total))
+    capital = final_capital[active]
+    lane_total = total[active]
+    lane_pA = pA[active]
+    if uniform_stream is not None:
+        num_streams = int(uniform_stream.max()) + 1 if uniform_stream.size else 0
     
-    P_ruin_A = 1 - np.mean(A_wins_list)
-    avg_rounds = np.mean(num_rounds_list)
+    rounds = 0
+    draws = 0
+    while active.size > 0 and rounds < max_rounds:
+        if step_source is not None:
+            won = step_source.draw(active.size)
+        else:
+            if uniform_stream is None:
+                uniforms = rng.random(active.size)
+            else:
+                uniforms = rng.random(num_streams)[uniform_stream[active]]
+            draws += uniforms.size
+            won = uniforms < lane_pA
+        capital += np.where(won, 1, -1)
+        rounds += 1
+        
+        finished = (capital <= 0) | (capital >= lane_total)
+        if finished.any():
+            final_capital[active[finished]] = capital[finished]
+            num_rounds[active[finished]] = rounds
+            running = ~finished
+            active = active[running]
+            capital = capital[running]
+            lane_total = lane_total[running]
+            lane_pA = lane_pA[running]
     
-    return {
-        'A_wins': A_wins_list,
-        'num_rounds': num_rounds_list,
-        'P_ruin_A': P_ruin_A,
-        'avg_rounds': avg_rounds
-    }
+    # Games still running were truncated at max_rounds
+    final_capital[active] = capital
+    num_rounds[active] = rounds
+    
+    if _instrumentation is not None:
+        if step_source is not None:
+            draws += step_source.words
+        _instrumentation.count(games=num_simulations, rounds=num_rounds.sum(), rng_draws=draws,
+                               truncated=active.size)
+    return final_capital, num_rounds
 
 
-def theoretical_P_ruin_A(a: int, b: int, pA: float) -> float:
+def _run_chunk(task: Tuple) -> Tuple:
+    """Run one chunk of a simulation kernel with its own Generator (picklable for the pool)."""
+    kernel, kwargs, num_simulations, seed_sequence = task
+    return kernel(num_simulations=num_simulations, rng=np.random.default_rng(seed_sequence), **kwargs)
+
+
+def _run_chunk_instrumented(task: Tuple) -> Tuple:
+    """Run a chunk in a worker process and send its instrumentation back to the parent."""
+    with instrument() as instrumentation:
+        result = _run_chunk(task)
+    return result, instrumentation
+
+
+def _iter_chunks(kernel: Callable, kwargs: Dict, num_simulations: int,
+                 seed: Optional[int] = None, workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None):
     """
-    Calculate theoretical probability that player A goes bankrupt.
+    Split num_simulations games into chunks, run
+    kernel(num_simulations=n, rng=..., **kwargs) on each and yield the
+    partial results in chunk order.
     
-    Formula:
-    - If pA != 0.5: P_ruin_A = ((q/p)^a - (q/p)^(a+b)) / (1 - (q/p)^(a+b))
-    - If pA == 0.5: P_ruin_A = b / (a + b)
+    Every chunk gets an independent Generator spawned from
+    np.random.SeedSequence(seed). The output therefore depends only on
+    (seed, chunk_size), not on how many workers ran the chunks or in which
+    order they finished.
     
-    where q = 1 - pA, p = pA
+    Parameters:
+    -----------
+    seed : int, optional
+        Root seed for the SeedSequence (None draws fresh entropy)
+    workers : int, optional
+        Number of worker processes (None or 1 runs the chunks in-process)
+    chunk_size : int, optional
+        Games per chunk (default: num_simulations split evenly across workers)
     """
-    if pA == 0.5:
-        return b / (a + b)
-    else:
-        q = 1 - pA
-        p = pA
-        ratio = q / p
-        numerator = ratio**a - ratio**(a + b)
-        denominator = 1 - ratio**(a + b)
-        return numerator / denominator
+    if chunk_size is None:
+        chunk_size = -(-num_simulations // (workers or 1))
+    chunk_size = max(chunk_size, 1)
+    
+    sizes = [min(chunk_size, num_simulations - start) for start in range(0, num_simulations, chunk_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(kernel, kwargs, size, seq) for size, seq in zip(sizes, seed_sequences)]
+    
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_chunk(task)
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        if _instrumentation is None:
+            yield from pool.map(_run_chunk, tasks)
+            return
+        for result, instrumentation in pool.map(_run_chunk_instrumented, tasks):
+            _instrumentation.merge(instrumentation)
+            yield result
 
 
-def theoretical_expected_rounds(a: int, b: int, pA: float) -> float:
+def _run_chunked(kernel: Callable, kwargs: Dict, num_simulations: int,
+                 seed: Optional[int] = None, workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None) -> List:
+    """Run _iter_chunks to completion and return the list of partial results."""
+    return list(_iter_chunks(kernel, kwargs, num_simulations, seed, workers, chunk_size))
+
+
+class DurationStats:
     """
-    Calculate theoretical expected number of rounds.
+    Constant-memory, mergeable summary of many games.
     
-    Formula:
-    - If pA == 0.5: E[L] = a * b
-    - If pA != 0.5: More complex formula involving q/p ratio
+    Tracks the ruin count, the number of games truncated at max_rounds, the
+    Welford mean/variance of the duration L, LMIN/LMAX, a fixed-bin duration
+    histogram and a log-bucketed quantile sketch (relative accuracy
+    `relative_accuracy`). Memory depends only on max_rounds and num_bins,
+    never on the number of games; two accumulators with the same settings
+    can be combined with merge().
     """
-    if pA == 0.5:
-        return a * b
-    else:
-        q = 1 - pA
-        p = pA
-        ratio = q / p
-        P_ruin = theoretical_P_ruin_A(a, b, pA)
+    
+    def __init__(self, max_rounds: int = 100000, num_bins: int = 1000, relative_accuracy: float = 0.01):
+        self.max_rounds = max_rounds
+        self.count = 0
+        self.ruin_count = 0
+        self.truncated_count = 0
+        self.mean = 0.0
+        self.M2 = 0.0
+        self.min = None
+        self.max = None
+        
+        # Histogram bin i covers durations [i * bin_width, (i + 1) * bin_width)
+        self.bin_width = max(1, -(-(max_rounds + 1) // num_bins))
+        self.histogram = np.zeros(num_bins, dtype=np.int64)
         
-        if ratio == 1:
-            return a * b
+        # Sketch bucket 0 holds L = 0, bucket i >= 1 holds gamma^(i-2) < L <= gamma^(i-1)
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        num_buckets = int(np.ceil(np.log(max(max_rounds, 1)) / np.log(self.gamma))) + 2
+        self.sketch = np.zeros(num_buckets, dtype=np.int64)
+    
+    def update(self, num_rounds: np.ndarray, ruined: np.ndarray, truncated: np.ndarray) -> None:
+        """Add a batch of games (arrays of durations, ruin-of-A and truncation flags)."""
+        num_rounds = np.asarray(num_rounds)
+        n = num_rounds.size
+        if n == 0:
+            return
         
-        term1 = (a + b) * (ratio**(a + b) - 1) / ((ratio**(a + b) - 1) * (p - q))
-        term2 = a / (p - q)
-        term3 = (a + b) * P_ruin / (p - q)
+        batch_mean = num_rounds.mean()
+        batch_M2 = np.sum((num_rounds - batch_mean)**2)
+        self._combine_moments(n, batch_mean, batch_M2)
         
-        # Simplified formula for expected duration
-        if abs(p - q) < 1e-10:
-            return a * b
+        self.ruin_count += int(np.count_nonzero(ruined))
+        self.truncated_count += int(np.count_nonzero(truncated))
+        batch_min, batch_max = int(num_rounds.min()), int(num_rounds.max())
+        self.min = batch_min if self.min is None else min(self.min, batch_min)
+        self.max = batch_max if self.max is None else max(self.max, batch_max)
         
-        E_L = (a / (p - q)) - ((a + b) / (p - q)) * P_ruin
+        bins = np.minimum(num_rounds // self.bin_width, self.histogram.size - 1)
+        self.histogram += np.bincount(bins, minlength=self.histogram.size)
+        self.sketch += np.bincount(self._sketch_index(num_rounds), minlength=self.sketch.size)[:self.sketch.size]
+    
+    def merge(self, other: 'DurationStats') -> 'DurationStats':
+        """Fold another accumulator with the same settings into this one."""
+        if (self.bin_width, self.histogram.size, self.gamma) != (other.bin_width, other.histogram.size, other.gamma):
+            raise ValueError("Cannot merge DurationStats with different binning")
+        if other.count == 0:
+            return self
         
-        return E_L
+        self._combine_moments(other.count, other.mean, other.M2)
+        self.ruin_count += other.ruin_count
+        self.truncated_count += other.truncated_count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.histogram += other.histogram
+        self.sketch += other.sketch
+        return self
+    
+    def _combine_moments(self, n: int, mean: float, M2: float) -> None:
+        # Chan et al. parallel update of the Welford accumulators
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.M2 += M2 + delta**2 * self.count * n / total
+        self.count = total
+    
+    def _sketch_index(self, num_rounds: np.ndarray) -> np.ndarray:
+        index = np.zeros(num_rounds.shape, dtype=np.int64)
+        positive = num_rounds > 0
+        index[positive] = np.ceil(np.log(num_rounds[positive]) / np.log(self.gamma) - 1e-12).astype(np.int64) + 1
+        return np.minimum(index, self.sketch.size - 1)
+    
+    @property
+    def P_ruin_A(self) -> float:
+        return self.ruin_count / self.count
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance of L."""
+        return self.M2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std(self) -> float:
+        return np.sqrt(self.variance)
+    
+    @property
+    def bin_edges(self) -> np.ndarray:
+        return np.arange(self.histogram.size + 1) * self.bin_width
+    
+    def quantile(self, q: float) -> float:
+        """Approximate quantile of L from the sketch (within relative_accuracy)."""
+        rank = q * (self.count - 1)
+        bucket = int(np.searchsorted(np.cumsum(self.sketch), rank, side='right'))
+        if bucket == 0:
+            return 0.0
+        estimate = 2 * self.gamma**(bucket - 1) / (self.gamma + 1)
+        return float(min(max(estimate, self.min), self.max))
 
 
-def simulate_game_with_wins(a: int, b: int, pA: float, max_rounds: int = 100000) -> Tuple[bool, int, List[int], List[int]]:
+class Distribution:
     """
-    Simulate a single Gambler's Ruin game and track wins.
+    Mergeable distribution of an integer quantity (durations L, capitals k).
+    
+    Counts live in a NumPy array: dense (counts[i] is the count of
+    offset + i, built with np.bincount) or, when the support is much wider
+    than the number of distinct values (e.g. durations up to max_rounds),
+    sparse (sorted values with their counts). The layout is chosen
+    automatically and is invisible to the statistics, which are all computed
+    from the counts in one vectorized pass instead of over the raw values.
+    
+    Counts may also be float weights, e.g. exact probabilities:
+    Distribution(P_k) gives the mean, quantiles and top-k of P(k).
+    Quantiles interpolate between order statistics like np.quantile for
+    integer counts and take the smallest value with CDF >= q for weights.
+    """
+    
+    # Dense only while the support is at most this many times the number of values
+    SPARSE_RATIO = 8
+    
+    def __init__(self, counts: np.ndarray, offset: int = 0, values: Optional[np.ndarray] = None):
+        self.counts = np.asarray(counts)
+        self.offset = int(offset)
+        self.values = None if values is None else np.asarray(values, dtype=np.int64)
+    
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'Distribution':
+        """Count an array of integers (any shape)."""
+        values = np.asarray(values, dtype=np.int64).ravel()
+        if values.size == 0:
+            return cls(np.zeros(0, dtype=np.int64))
+        low, high = int(values.min()), int(values.max())
+        if high - low + 1 <= cls.SPARSE_RATIO * max(values.size, 1024):
+            return cls(np.bincount(values - low), low)
+        support, counts = np.unique(values, return_counts=True)
+        return cls(counts, values=support)
+    
+    @property
+    def sparse(self) -> bool:
+        return self.values is not None
+    
+    @property
+    def support(self) -> np.ndarray:
+        """Value of every stored count (including zero counts in the dense layout)."""
+        return self.values if self.sparse else self.offset + np.arange(self.counts.size)
+    
+    def nonzero(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, counts) of the values that occur, in increasing order."""
+        keep = self.counts > 0
+        return self.support[keep], self.counts[keep]
+    
+    def update(self, values: np.ndarray) -> 'Distribution':
+        """Add a batch of raw values."""
+        return self.merge(Distribution.from_values(values))
+    
+    def merge(self, other: 'Distribution') -> 'Distribution':
+        """
+        Fold another distribution into this one. The cost depends on the
+        supports, not on the number of values counted.
+        """
+        if other.counts.size == 0:
+            return self
+        if self.counts.size == 0:
+            self.counts, self.offset, self.values = other.counts.copy(), other.offset, other.values
+            return self
+        
+        if not self.sparse and not other.sparse:
+            low = min(self.offset, other.offset)
+            high = max(self.offset + self.counts.size, other.offset + other.counts.size)
+            if high - low <= self.SPARSE_RATIO * (self.counts.size + other.counts.size):
+                counts = np.zeros(high - low, dtype=np.result_type(self.counts, other.counts))
+                counts[self.offset - low:self.offset - low + self.counts.size] += self.counts
+                counts[other.offset - low:other.offset - low + other.counts.size] += other.counts
+                self.counts, self.offset = counts, low
+                return self
+        
+        values_self, counts_self = self.nonzero()
+        values_other, counts_other = other.nonzero()
+        support, index = np.unique(np.concatenate([values_self, values_other]), return_inverse=True)
+        counts = np.bincount(index, weights=np.concatenate([counts_self, counts_other]))
+        integer = counts_self.dtype.kind in 'iu' and counts_other.dtype.kind in 'iu'
+        self.counts = counts.astype(np.int64) if integer else counts
+        self.values, self.offset = support, 0
+        return self
+    
+    @property
+    def total(self):
+        """Number of values counted (total weight for float counts)."""
+        return self.counts.sum()
+    
+    @property
+    def mean(self) -> float:
+        return float(self.support @ self.counts / self.total)
+    
+    @property
+    def variance(self) -> float:
+        """Population variance (as np.var)."""
+        return float((self.support - self.mean)**2 @ self.counts / self.total)
+    
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+    
+    @property
+    def min(self) -> int:
+        return int(self.nonzero()[0][0])
+    
+    @property
+    def max(self) -> int:
+        return int(self.nonzero()[0][-1])
+    
+    def quantile(self, q: float) -> float:
+        """q-quantile (see the class docstring for the definition)."""
+        values, counts = self.nonzero()
+        cumulative = np.cumsum(counts)
+        if counts.dtype.kind == 'f':
+            index = min(int(np.searchsorted(cumulative, q * cumulative[-1])), values.size - 1)
+            return float(values[index])
+        # Linear interpolation between the order statistics at ranks floor(h) and ceil(h)
+        h = q * (cumulative[-1] - 1)
+        lower = values[np.searchsorted(cumulative, math.floor(h), side='right')]
+        upper = values[np.searchsorted(cumulative, math.ceil(h), side='right')]
+        return float(lower + (h - math.floor(h)) * (upper - lower))
+    
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+    
+    @property
+    def mode(self) -> int:
+        """Most frequent value (the smallest one on ties)."""
+        return int(self.support[np.argmax(self.counts)])
+    
+    def top(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, counts) of the k most frequent values, most frequent first (smaller value first on ties)."""
+        values, counts = self.nonzero()
+        order = np.lexsort((values, -counts))[:k]
+        return values[order], counts[order]
+    
+    def pmf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, probabilities) of the values that occur."""
+        values, counts = self.nonzero()
+        return values, counts / counts.sum()
+    
+    def __repr__(self) -> str:
+        layout = 'sparse' if self.sparse else 'dense'
+        return f"Distribution({layout}, total={self.total}, support=[{self.min}, {self.max}])" if self.counts.size \
+            else "Distribution(empty)"
+
+
+def _simulate_batch_stats(a: int, b: int, pA: float, num_simulations: int,
+                          max_rounds: int = 100000, rng=None,
+                          batch: Callable = _simulate_batch) -> DurationStats:
+    """Simulate a batch of games with the given batch kernel and reduce it to a DurationStats accumulator."""
+    final_capital, num_rounds = batch(a, b, pA, num_simulations, max_rounds, rng)
+    stats = DurationStats(max_rounds)
+    stats.update(num_rounds, final_capital <= 0, (final_capital > 0) & (final_capital < a + b))
+    return stats
+
+
+def _simulate_batch_antithetic(a: int, b: int, pA: float, num_pairs: int,
+                               max_rounds: int = 100000, rng=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate num_pairs antithetic pairs of games in lockstep.
+    
+    In every round both games of a pair use the same uniform U: the first
+    game wins the round if U < pA, its mirror if 1 - U < pA. A game that has
+    ended stays frozen while its partner continues.
     
     Returns:
     --------
-    Tuple[bool, int, List[int], List[int]]
-        (A_wins, num_rounds, capital_history, wins_history)
-        - A_wins: True if A wins, False if B wins
-        - num_rounds: Number of rounds until game ends
-        - capital_history: List of A's capital after each round
-        - wins_history: List of cumulative wins for A after each round
+    Tuple[np.ndarray, np.ndarray]
+        (final_capital, num_rounds), each of shape (num_pairs, 2)
     """
-    capital_A = a
-    capital_B = b
+    rng = np.random if rng is None else rng
+    total = a + b
+    final_capital = np.full((num_pairs, 2), a, dtype=np.int64)
+    num_rounds = np.zeros((num_pairs, 2), dtype=np.int64)
+    
+    active = np.arange(num_pairs) if 0 < a < total else np.arange(0)
+    capital = final_capital[active]
+    played = num_rounds[active]
+    finished = np.zeros(capital.shape, dtype=bool)
+    
     rounds = 0
-    wins_A = 0
-    capital_history = [capital_A]
-    wins_history = [0]
+    draws = 0
+    while active.size > 0 and rounds < max_rounds:
+        uniforms = rng.random(active.size)
+        draws += active.size
+        won = np.stack([uniforms < pA, 1 - uniforms < pA], axis=1)
+        capital += np.where(finished, 0, np.where(won, 1, -1))
+        played += ~finished
+        rounds += 1
+        
+        finished |= (capital <= 0) | (capital >= total)
+        pair_done = finished.all(axis=1)
+        if pair_done.any():
+            final_capital[active[pair_done]] = capital[pair_done]
+            num_rounds[active[pair_done]] = played[pair_done]
+            running = ~pair_done
+            active = active[running]
+            capital = capital[running]
+            played = played[running]
+            finished = finished[running]
     
-    while capital_A > 0 and capital_B > 0 and rounds < max_rounds:
-        if np.random.random() < pA:
-            capital_A += 1
-            capital_B -= 1
-            wins_A += 1
+    final_capital[active] = capital
+    num_rounds[active] = played
+    if _instrumentation is not None:
+        _instrumentation.count(games=2 * num_pairs, rounds=num_rounds.sum(), rng_draws=draws,
+                               truncated=(~finished).sum())
+    return final_capital, num_rounds
+
+
+def _variance_ratio(plain_variance: float, reduced_variance: float) -> float:
+    """Variance-reduction factor, inf when the reduced estimator has no variance (up to round-off)."""
+    if reduced_variance <= 1e-12 * plain_variance or reduced_variance <= 0:
+        return np.inf if plain_variance > 0 else 1.0
+    return float(plain_variance / reduced_variance)
+
+
+def _control_variate_estimate(target: np.ndarray, controls: np.ndarray) -> Tuple[float, float]:
+    """
+    Control-variate estimate of E[target] using zero-mean controls.
+    
+    The coefficients are fitted by least squares on the sample; returns the
+    adjusted mean and the variance-reduction factor var(target) / var(residual).
+    """
+    centered = controls - controls.mean(axis=0)
+    coefficients = np.linalg.lstsq(centered, target - target.mean(), rcond=None)[0]
+    adjusted = target - controls @ coefficients
+    return float(adjusted.mean()), _variance_ratio(target.var(ddof=1), adjusted.var(ddof=1))
+
+
+def simulate_multiple_games(a: int, b: int, pA: float, num_simulations: int = 10000,
+                            max_rounds: Optional[int] = 100000, seed: Optional[int] = None,
+                            workers: Optional[int] = None,
+                            chunk_size: Optional[int] = None,
+                            stream: bool = False,
+                            variance_reduction: Optional[str] = None,
+                            backend: Optional[str] = None,
+                            distribution: bool = False) -> Dict:
+    """
+    Run multiple simulations and collect statistics.
+    
+    The games are run by the batch kernel of the selected backend (see
+    get_backend; the default NumPy backend advances all games together, see
+    _simulate_batch), which gives the same results in distribution as calling
+    simulate_game num_simulations times. Games reaching max_rounds are truncated exactly
+    as in simulate_game: A counts as the winner if A's capital is positive.
+    
+    For large capitals use backend='leap' (binomial leap-ahead, see
+    _leap_walk): its cost grows with the number of leaps rather than rounds,
+    and max_rounds=None (leap backend only, not streaming) plays every game
+    to absorption, so no game is truncated.
+    
+    By default the global np.random state is used. Passing seed, workers or
+    chunk_size switches to independent SeedSequence-spawned streams per chunk
+    (see _run_chunked), optionally spread over a process pool; results are
+    bit-identical for a given (seed, workers, chunk_size).
+    
+    With stream=True the games are simulated in chunks (at most 100,000
+    games each unless chunk_size is given) and reduced to a DurationStats
+    accumulator, so memory stays constant in num_simulations. The per-game
+    lists are then omitted from the result.
+    
+    variance_reduction selects a lower-variance estimator (in-process, NumPy
+    engine only, so backend, or GAMBLER_RUIN_BACKEND if it is None, must
+    resolve to 'numpy'):
+    - 'antithetic': games come in pairs driven by U and 1 - U in every round
+      (num_simulations is rounded up to an even number)
+    - 'control_variate': adjusts the estimates with Wald's identities, whose
+      expectations are known exactly for the stopped walk:
+      E[(X_L - a) - (2pA - 1) L] = 0 and E[((X_L - a) - (2pA - 1) L)^2 - 4pq L] = 0,
+      where X_L is A's final capital
+    The achieved variance-reduction factor (plain variance / reduced variance
+    per game) is returned for both estimates.
+    
+    With distribution=True the per-game lists are replaced by a Distribution
+    of the durations (exact, mergeable and cheap to query).
+    
+    Returns:
+    --------
+    Dict with keys:
+        - A_wins: List of booleans (True if A won; omitted when streaming or with distribution)
+        - num_rounds: List of round counts (omitted when streaming or with distribution)
+        - duration: Distribution of the round counts (only with distribution)
+        - P_ruin_A: Probability that A goes bankrupt
+        - avg_rounds: Average number of rounds
+        - truncated: Number of games stopped at max_rounds (counted as not
+          ruined, so a non-zero value biases P_ruin_A downwards)
+        - stats: DurationStats accumulator (only when streaming)
+        - variance_reduction: Dict of variance-reduction factors for
+          P_ruin_A and avg_rounds (only with variance_reduction)
+    """
+    if max_rounds is None and (stream or variance_reduction is not None or get_backend(backend).name != 'leap'):
+        raise ValueError("max_rounds=None needs backend='leap', stream=False and no variance_reduction")
+    if variance_reduction is not None:
+        if variance_reduction not in ('antithetic', 'control_variate'):
+            raise ValueError(f"Unknown variance_reduction {variance_reduction!r}")
+        if stream or workers is not None or chunk_size is not None:
+            raise ValueError("variance_reduction cannot be combined with stream, workers or chunk_size")
+        resolved = get_backend(backend).name
+        if resolved != 'numpy':
+            raise ValueError(f"variance_reduction runs on the NumPy engine, not backend {resolved!r}")
+        return _simulate_multiple_games_reduced(a, b, pA, num_simulations, max_rounds,
+                                                seed, variance_reduction, distribution)
+    
+    batch = get_backend(backend).batch
+    if stream:
+        stats = DurationStats(max_rounds)
+        if seed is None and workers is None and chunk_size is None:
+            for start in range(0, num_simulations, 100000):
+                stats.merge(_simulate_batch_stats(a, b, pA, min(100000, num_simulations - start), max_rounds,
+                                                  batch=batch))
         else:
-            capital_A -= 1
-            capital_B += 1
-        
-        rounds += 1
-        capital_history.append(capital_A)
-        wins_history.append(wins_A)
+            if chunk_size is None:
+                chunk_size = min(-(-num_simulations // (workers or 1)), 100000)
+            kwargs = {'a': a, 'b': b, 'pA': pA, 'max_rounds': max_rounds, 'batch': batch}
+            for partial in _iter_chunks(_simulate_batch_stats, kwargs, num_simulations, seed, workers, chunk_size):
+                stats.merge(partial)
+        return {
+            'P_ruin_A': stats.P_ruin_A,
+            'avg_rounds': stats.mean,
+            'truncated': stats.truncated_count,
+            'stats': stats
+        }
     
-    A_wins = (capital_A > 0)
-    return A_wins, rounds, capital_history, wins_history
+    if seed is None and workers is None and chunk_size is None:
+        final_capital, num_rounds = batch(a, b, pA, num_simulations, max_rounds)
+    else:
+        kwargs = {'a': a, 'b': b, 'pA': pA, 'max_rounds': max_rounds}
+        chunks = _run_chunked(batch, kwargs, num_simulations, seed, workers, chunk_size)
+        final_capital = np.concatenate([chunk[0] for chunk in chunks])
+        num_rounds = np.concatenate([chunk[1] for chunk in chunks])
+    A_wins = final_capital > 0
+    
+    P_ruin_A = 1 - np.mean(A_wins)
+    avg_rounds = np.mean(num_rounds)
+    
+    results = {
+        'P_ruin_A': P_ruin_A,
+        'avg_rounds': avg_rounds,
+        'truncated': int((A_wins & (final_capital < a + b)).sum())
+    }
+    if distribution:
+        results['duration'] = Distribution.from_values(num_rounds)
+    else:
+        results.update(A_wins=A_wins.tolist(), num_rounds=num_rounds.tolist())
+    return results
+
+
+def _simulate_multiple_games_reduced(a: int, b: int, pA: float, num_simulations: int,
+                                     max_rounds: int, seed: Optional[int], method: str,
+                                     distribution: bool = False) -> Dict:
+    """Variance-reduced branch of simulate_multiple_games."""
+    rng = None if seed is None else np.random.default_rng(seed)
+    
+    if method == 'antithetic':
+        pairs_capital, pairs_rounds = _simulate_batch_antithetic(a, b, pA, -(-num_simulations // 2),
+                                                                 max_rounds, rng)
+        ruined_pairs = (pairs_capital <= 0).astype(float)
+        final_capital, num_rounds = pairs_capital.ravel(), pairs_rounds.ravel()
+        P_ruin_A = ruined_pairs.mean()
+        avg_rounds = num_rounds.mean()
+        # Per game, plain MC has var(X); the antithetic pair mean carries var(pair mean) / 2 per game
+        factors = {
+            'P_ruin_A': _variance_ratio(ruined_pairs.var(ddof=1), 2 * ruined_pairs.mean(axis=1).var(ddof=1)),
+            'avg_rounds': _variance_ratio(pairs_rounds.var(ddof=1), 2 * pairs_rounds.mean(axis=1).var(ddof=1))
+        }
+    else:
+        final_capital, num_rounds = _simulate_batch(a, b, pA, num_simulations, max_rounds, rng)
+        drift = 2 * pA - 1
+        martingale = (final_capital - a) - drift * num_rounds
+        controls = np.column_stack([martingale, martingale**2 - 4 * pA * (1 - pA) * num_rounds]).astype(float)
+        P_ruin_A, factor_P = _control_variate_estimate((final_capital <= 0).astype(float), controls)
+        avg_rounds, factor_L = _control_variate_estimate(num_rounds.astype(float), controls)
+        factors = {'P_ruin_A': factor_P, 'avg_rounds': factor_L}
+    
+    A_wins = final_capital > 0
+    results = {
+        'P_ruin_A': P_ruin_A,
+        'avg_rounds': avg_rounds,
+        'truncated': int((A_wins & (final_capital < a + b)).sum()),
+        'variance_reduction': factors
+    }
+    if distribution:
+        results['duration'] = Distribution.from_values(num_rounds)
+    else:
+        results.update(A_wins=A_wins.tolist(), num_rounds=num_rounds.tolist())
+    return results
+
+
+def wilson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p_hat = successes / n
+    denominator = 1 + z**2 / n
+    center = (p_hat + z**2 / (2 * n)) / denominator
+    half_width = z * math.sqrt(p_hat * (1 - p_hat) / n + z**2 / (4 * n**2)) / denominator
+    low = 0.0 if successes == 0 else max(0.0, center - half_width)
+    high = 1.0 if successes == n else min(1.0, center + half_width)
+    return low, high
+
+
+def _betainc(x: float, alpha: float, beta: float) -> float:
+    """Regularized incomplete beta function I_x(alpha, beta) (continued fraction)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (alpha + 1) / (alpha + beta + 2):
+        return 1.0 - _betainc(1 - x, beta, alpha)
+    
+    log_front = (math.lgamma(alpha + beta) - math.lgamma(alpha) - math.lgamma(beta)
+                 + alpha * math.log(x) + beta * math.log1p(-x))
+    
+    # Modified Lentz evaluation of the continued fraction
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (alpha + beta) * x / (alpha + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 100000):
+        for numerator in (m * (beta - m) * x / ((alpha + 2 * m - 1) * (alpha + 2 * m)),
+                          -(alpha + m) * (alpha + beta + m) * x / ((alpha + 2 * m) * (alpha + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1e-15:
+            break
+    return math.exp(log_front) * fraction / alpha
+
+
+def _beta_ppf(q: float, alpha: float, beta: float) -> float:
+    """Quantile of the Beta(alpha, beta) distribution by bisection on _betainc."""
+    low, high = 0.0, 1.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if _betainc(mid, alpha, beta) < q:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def clopper_pearson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Exact (Clopper-Pearson) interval for a binomial proportion."""
+    tail = (1 - confidence) / 2
+    low = 0.0 if successes == 0 else _beta_ppf(tail, successes, n - successes + 1)
+    high = 1.0 if successes == n else _beta_ppf(1 - tail, successes + 1, n - successes)
+    return low, high
 
 
-def simulate_capital_after_N_rounds(a: int, b: int, pA: float, N: int, num_simulations: int = 10000) -> List[int]:
+def simulate_until_precision(a: int, b: int, pA: float, target: str = 'P_ruin_A',
+                             abs_tol: Optional[float] = None, rel_tol: Optional[float] = None,
+                             confidence: float = 0.95, method: str = 'wilson',
+                             initial_games: int = 1000, max_games: int = 10**7,
+                             time_budget: Optional[float] = None, max_rounds: int = 100000,
+                             seed: Optional[int] = None, workers: Optional[int] = None,
+                             sample: Optional[Callable[[int], 'DurationStats']] = None) -> Dict:
     """
-    Simulate capital of player A after N rounds (game may continue or end before N).
+    Simulate games in growing batches until the confidence interval is narrow enough.
+    
+    Parameters:
+    -----------
+    target : str
+        'P_ruin_A' (binomial interval, see method) or 'avg_rounds' (normal
+        interval for the mean duration)
+    abs_tol, rel_tol : float, optional
+        Stop once the CI half-width is <= abs_tol or <= rel_tol * estimate.
+        While no ruin has been observed the estimate of P_ruin_A is 0 and
+        rel_tol cannot be met; without abs_tol the run then stops (not
+        converged) as soon as even P_ruin_A = ci_high would need more than
+        max_games games to reach rel_tol, instead of spending max_games on
+        a ruin that is too rare to observe (see
+        simulate_ruin_importance_sampling for those).
+    method : str
+        'wilson' or 'clopper-pearson' (only used for target='P_ruin_A')
+    initial_games, max_games : int
+        Size of the first batch and the hard cap on the number of games
+    time_budget : float, optional
+        Wall-clock budget in seconds; no new batch is started once it is spent
+    seed, workers :
+        As in simulate_multiple_games; batch i uses the stream [seed, i]
+    sample : callable, optional
+        sample(n) returns a DurationStats of the next n games, replacing the
+        call to simulate_multiple_games (e.g. to take games from a
+        SimulationCache); seed and workers are then ignored
     
     Returns:
     --------
-    List of final capital values after N rounds (or when game ended)
+    Dict with keys:
+        - estimate, ci_low, ci_high, half_width: Estimate of target and its interval
+        - num_games: Number of games actually simulated
+        - converged: True if the requested precision was reached
+        - P_ruin_A, avg_rounds, stats: As in simulate_multiple_games(stream=True)
     """
-    final_capitals = []
+    if target not in ('P_ruin_A', 'avg_rounds'):
+        raise ValueError(f"target must be 'P_ruin_A' or 'avg_rounds', got {target!r}")
+    if method not in ('wilson', 'clopper-pearson'):
+        raise ValueError(f"method must be 'wilson' or 'clopper-pearson', got {method!r}")
+    if abs_tol is None and rel_tol is None:
+        raise ValueError("At least one of abs_tol and rel_tol must be given")
     
-    for _ in range(num_simulations):
-        capital_A = a
-        capital_B = b
+    root_entropy = np.random.SeedSequence(seed).entropy
+    start_time = time.perf_counter()
+    stats = DurationStats(max_rounds)
+    batch_size = initial_games
+    batch_index = 0
+    
+    while True:
+        if sample is None:
+            batch = simulate_multiple_games(a, b, pA, batch_size, max_rounds,
+                                            seed=[root_entropy, batch_index], workers=workers, stream=True)
+            stats.merge(batch['stats'])
+        else:
+            stats.merge(sample(batch_size))
+        batch_index += 1
         
-        for round_num in range(N):
-            if capital_A <= 0 or capital_B <= 0:
+        if target == 'P_ruin_A':
+            estimate = stats.P_ruin_A
+            interval = wilson_interval if method == 'wilson' else clopper_pearson_interval
+            ci_low, ci_high = interval(stats.ruin_count, stats.count, confidence)
+        else:
+            estimate = stats.mean
+            z = NormalDist().inv_cdf(0.5 + confidence / 2)
+            margin = z * stats.std / math.sqrt(stats.count)
+            ci_low, ci_high = estimate - margin, estimate + margin
+        half_width = (ci_high - ci_low) / 2
+        
+        tolerance = max(abs_tol or 0.0, (rel_tol or 0.0) * abs(estimate))
+        converged = half_width <= tolerance
+        out_of_time = time_budget is not None and time.perf_counter() - start_time >= time_budget
+        if converged or out_of_time or stats.count >= max_games:
+            break
+        if target == 'P_ruin_A' and abs_tol is None and stats.ruin_count == 0:
+            # Games a relative half-width of rel_tol needs at the most optimistic P_ruin_A
+            z = NormalDist().inv_cdf(0.5 + confidence / 2)
+            if z**2 * (1 - ci_high) / (rel_tol**2 * ci_high) > max_games:
                 break
+        
+        # Half-width shrinks like 1/sqrt(n): aim for the required n, at most doubling
+        if tolerance > 0:
+            needed = stats.count * (half_width / tolerance)**2
+        else:
+            needed = 2 * stats.count
+        batch_size = int(min(max(needed - stats.count, initial_games), stats.count, max_games - stats.count))
+    
+    return {
+        'estimate': estimate,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'half_width': half_width,
+        'num_games': stats.count,
+        'converged': converged,
+        'P_ruin_A': stats.P_ruin_A,
+        'avg_rounds': stats.mean,
+        'stats': stats
+    }
+
+
+def _write_checkpoint(path: str, checkpoint: Dict) -> None:
+    """Write a checkpoint atomically: a crash leaves either the old or the new file, never a partial one."""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def simulate_with_checkpoints(a: int, b: int, pA: float, num_simulations: int, checkpoint_path: str,
+                              seed: Optional[int] = None, max_rounds: int = 100000,
+                              chunk_size: int = 100000, checkpoint_interval: float = 60.0,
+                              backend: Optional[str] = None) -> Dict:
+    """
+    Long streaming run (as simulate_multiple_games(stream=True)) that can be
+    interrupted and resumed.
+    
+    Games are simulated chunk_size at a time from one np.random.Generator
+    and reduced into a DurationStats accumulator. At most every
+    checkpoint_interval seconds (and at the end) the accumulator, the number
+    of games done and the exact bit-generator state are written atomically
+    to checkpoint_path. If checkpoint_path exists, the run continues from it,
+    so an interrupted run resumed any number of times gives exactly the
+    result of an uninterrupted one. Each checkpoint costs a few milliseconds,
+    far below 1% of the default interval.
+    
+    seed=None draws fresh entropy; it is recorded in the checkpoint, so the
+    resumed run still matches.
+    
+    Returns:
+    --------
+    Dict with keys:
+        - P_ruin_A, avg_rounds, truncated, stats: As in simulate_multiple_games(stream=True)
+        - resumed_from: Games already done when this call started (0 for a fresh run)
+        - checkpoints: Checkpoints written by this call
+    """
+    batch = get_backend(backend).batch
+    entropy = np.random.SeedSequence(seed).entropy
+    run = {'a': a, 'b': b, 'pA': pA, 'num_simulations': num_simulations, 'max_rounds': max_rounds,
+           'chunk_size': chunk_size, 'backend': get_backend(backend).name}
+    
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'rb') as f:
+            checkpoint = pickle.load(f)
+        if checkpoint['run'] != run or (seed is not None and checkpoint['entropy'] != entropy):
+            raise ValueError(f"Checkpoint {checkpoint_path!r} belongs to a different run: {checkpoint['run']}")
+        rng = np.random.default_rng()
+        rng.bit_generator.state = checkpoint['rng_state']
+    else:
+        checkpoint = {'run': run, 'entropy': entropy, 'games_done': 0, 'stats': DurationStats(max_rounds)}
+        rng = np.random.default_rng(entropy)
+    stats = checkpoint['stats']
+    resumed_from = games_done = checkpoint['games_done']
+    
+    checkpoints = 0
+    last_checkpoint = time.perf_counter()
+    while games_done < num_simulations:
+        size = min(chunk_size, num_simulations - games_done)
+        stats.merge(_simulate_batch_stats(a, b, pA, size, max_rounds, rng, batch))
+        games_done += size
+        
+        if games_done == num_simulations or time.perf_counter() - last_checkpoint >= checkpoint_interval:
+            with phase('checkpoint'):
+                checkpoint.update(games_done=games_done, rng_state=rng.bit_generator.state)
+                _write_checkpoint(checkpoint_path, checkpoint)
+            checkpoints += 1
+            last_checkpoint = time.perf_counter()
+    
+    return {
+        'P_ruin_A': stats.P_ruin_A,
+        'avg_rounds': stats.mean,
+        'truncated': stats.truncated_count,
+        'stats': stats,
+        'resumed_from': resumed_from,
+        'checkpoints': checkpoints
+    }
+
+
+# Below this value of |(a+b) * (q-p)| the closed forms lose precision to
+# cancellation and the moments are evaluated by their series in eps = (q-p)/2
+_NEAR_FAIR_THRESHOLD = 2e-2
+
+
+def simulate_ruin_importance_sampling(a: int, b: int, pA: float, num_simulations: int = 10000,
+                                      max_rounds: int = 100000, seed: Optional[int] = None) -> Dict:
+    """
+    Estimate P(ruin of A) by importance sampling with exponential tilting.
+    
+    Games are simulated with A's win probability min(p, q): for p > q this is
+    the conjugate drift (p and q swapped), where ruin of A is as likely as
+    ruin of B was originally. Each path is weighted by its likelihood ratio
+    (p/q)^U (q/p)^D = (q/p)^(D - U), where U and D are the rounds A won and
+    lost; for a ruined path D - U = a, so rare ruin probabilities (e.g. 1e-18
+    for a = b = 50, pA = 0.7) are estimated without bias from a few thousand
+    games. For p <= q ruin is not rare, nothing is tilted and every weight
+    is 1 (plain Monte Carlo). Weights are handled in log space.
+    
+    Returns:
+    --------
+    Dict with keys:
+        - P_ruin_A: Unbiased estimate of P(ruin of A)
+        - std_error: Standard error of the estimate
+        - relative_error: std_error / P_ruin_A
+        - ess: Kish effective sample size of the weighted ruin indicators
+        - num_games: Number of simulated games
+    """
+    rng = None if seed is None else np.random.default_rng(seed)
+    final_capital, _ = _simulate_batch(a, b, min(pA, 1 - pA), num_simulations, max_rounds, rng)
+    ruined = final_capital <= 0
+    if not ruined.any():
+        return {'P_ruin_A': 0.0, 'std_error': 0.0, 'relative_error': np.inf, 'ess': 0.0,
+                'num_games': num_simulations}
+    
+    log_ratio = np.log1p(-pA) - np.log(pA) if pA > 0.5 else 0.0  # log(q/p) when tilted
+    log_weight = (a - final_capital[ruined]) * log_ratio
+    
+    # Scale by the largest weight so the sums stay representable
+    shift = log_weight.max()
+    contributions = np.zeros(num_simulations)
+    contributions[ruined] = np.exp(log_weight - shift)
+    
+    scale = np.exp(shift)
+    estimate = contributions.mean() * scale
+    std_error = contributions.std(ddof=1) / np.sqrt(num_simulations) * scale if num_simulations > 1 else 0.0
+    ess = contributions.sum()**2 / np.sum(contributions**2)
+    
+    return {
+        'P_ruin_A': float(estimate),
+        'std_error': float(std_error),
+        'relative_error': float(std_error / estimate) if estimate > 0 else np.inf,
+        'ess': float(ess),
+        'num_games': num_simulations
+    }
+
+
+def theoretical_duration_moments(a, b, pA) -> Dict:
+    """
+    Calculate P(ruin of A), E[L] and Var[L] for scalars or NumPy arrays.
+    
+    a, b and pA broadcast against each other, so a whole parameter grid is
+    evaluated in one call. The closed forms are written in terms of
+    x = log(q/p) = -2 atanh(p - q) after mirroring every point to p >= q
+    (swapping a and b), so powers (q/p)^k = exp(k x) never overflow and
+    differences like 1 - (q/p)^N use expm1. Near the fair game, where the
+    closed forms cancel catastrophically, the series in eps = (q-p)/2 is used
+    instead of an exact pA == 0.5 branch.
+    
+    Formulas (for p != q, N = a + b, r = q/p):
+    - P_ruin_A = (r^a - r^N) / (1 - r^N)
+    - E[L] = (N * (1 - P_ruin_A) - a) / (p - q)
+    - Var[L] = S_a - E[L]^2, where S_k = E[L^2 | start at k] solves
+      p S_{k+1} + q S_{k-1} - S_k = 1 - 2 E[L | k] with S_0 = S_N = 0
+    
+    Returns:
+    --------
+    Dict with keys (floats for scalar input, arrays otherwise):
+        - P_ruin_A: Probability that A goes bankrupt
+        - expected_rounds: E[L]
+        - variance_rounds: Var[L]
+    """
+    scalar = np.ndim(a) == 0 and np.ndim(b) == 0 and np.ndim(pA) == 0
+    a, b, pA = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float),
+                                   np.asarray(pA, dtype=float))
+    N = a + b
+    d = 2 * pA - 1  # p - q
+    
+    # Mirror to p >= q: (a, b, pA) -> (b, a, 1 - pA) leaves L unchanged and swaps ruin/win
+    mirrored = d < 0
+    a_m = np.where(mirrored, b, a)
+    d_m = np.abs(d)
+    
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        x = -2 * np.arctanh(d_m)  # log(q/p) <= 0 after mirroring
+        r_a = np.exp(a_m * x)
+        expm1_N = np.expm1(N * x)
+        P_win_m = np.expm1(a_m * x) / expm1_N
+        P_ruin_m = r_a * np.expm1((N - a_m) * x) / expm1_N
+        
+        E = (N * P_win_m - a_m) / d_m
+        
+        # Second moment S_a = A a^2 + B a + C a r^a + D (1 - r^a)
+        alpha = -1 / d_m
+        beta = -N / (d_m * expm1_N)
+        A = alpha**2
+        B = -alpha * (1 - 2 * beta - alpha**2)
+        C = 2 * alpha * beta
+        r_N = np.exp(N * x)
+        D = (A * N**2 + B * N + C * N * r_N) / expm1_N
+        S = A * a_m**2 + B * a_m + C * a_m * r_a - D * np.expm1(a_m * x)
+        V = S - E**2
+        
+        # The ratio of expm1 terms is accurate for any x != 0; only x == 0 needs b / N
+        P_ruin_A = np.where(mirrored, P_win_m, P_ruin_m)
+        P_ruin_A = np.where(d == 0, b / N, P_ruin_A)
+    
+    # E[L] and Var[L] cancel near the fair game: use their series in eps = (q - p) / 2
+    near_fair = np.abs(N * d) < _NEAR_FAIR_THRESHOLD
+    if np.any(near_fair):
+        eps = -d / 2
+        ab = a * b
+        E_series = ab * (1 + eps * 2 * (a - b) / 3 + eps**2 * 4 * (1 - ab) / 3
+                         + eps**3 * 8 * (a - b) * (3 * a**2 - 3 * a * N - N**2 + 10) / 45)
+        V_series = ab * (
+            (a**2 + b**2 - 2) / 3
+            + eps * 2 * (a - b) * (7 * a**2 - 10 * ab + 7 * b**2 - 10) / 45
+            - eps**2 * 4 * (a**4 + 17 * a**3 * b - 12 * ab**2 - 10 * a**2 + 17 * a * b**3
+                            - 10 * ab + b**4 - 10 * b**2 + 6) / 45
+            - eps**3 * 8 * (a - b) * (22 * a**4 + 91 * a**3 * b - 174 * ab**2 - 161 * a**2
+                                      + 91 * a * b**3 + 140 * ab + 22 * b**4 - 161 * b**2 + 112) / 945)
+        E = np.where(near_fair, E_series, E)
+        V = np.where(near_fair, V_series, V)
+    
+    # A game that starts at a boundary is already over
+    P_ruin_A = np.where(a <= 0, 1.0, np.where(b <= 0, 0.0, P_ruin_A))
+    over = (a <= 0) | (b <= 0)
+    E = np.where(over, 0.0, E)
+    V = np.where(over, 0.0, np.maximum(V, 0.0))
+    
+    if scalar:
+        return {'P_ruin_A': float(P_ruin_A), 'expected_rounds': float(E), 'variance_rounds': float(V)}
+    return {'P_ruin_A': P_ruin_A, 'expected_rounds': E, 'variance_rounds': V}
+
+
+def theoretical_P_ruin_A(a: int, b: int, pA: float) -> float:
+    """
+    Calculate theoretical probability that player A goes bankrupt.
+    
+    Formula:
+    - If pA != 0.5: P_ruin_A = ((q/p)^a - (q/p)^(a+b)) / (1 - (q/p)^(a+b))
+    - If pA == 0.5: P_ruin_A = b / (a + b)
+    
+    where q = 1 - pA, p = pA. Accepts NumPy arrays and is evaluated in an
+    overflow-safe form (see theoretical_duration_moments).
+    """
+    return theoretical_duration_moments(a, b, pA)['P_ruin_A']
+
+
+def theoretical_expected_rounds(a: int, b: int, pA: float) -> float:
+    """
+    Calculate theoretical expected number of rounds.
+    
+    Formula:
+    - If pA == 0.5: E[L] = a * b
+    - If pA != 0.5: E[L] = ((a + b) * (1 - P_ruin_A) - a) / (p - q)
+    
+    Accepts NumPy arrays (see theoretical_duration_moments).
+    """
+    return theoretical_duration_moments(a, b, pA)['expected_rounds']
+
+
+def theoretical_variance_rounds(a: int, b: int, pA: float) -> float:
+    """
+    Calculate theoretical variance of the number of rounds.
+    
+    For pA == 0.5: Var[L] = a * b * (a^2 + b^2 - 2) / 3. Accepts NumPy
+    arrays (see theoretical_duration_moments).
+    """
+    return theoretical_duration_moments(a, b, pA)['variance_rounds']
+
+
+def simulate_sweep(a, b, pA, num_simulations=10000, max_rounds: int = 100000,
+                   seed: Optional[int] = None, common_random_numbers: bool = False) -> List[Dict]:
+    """
+    Simulate a whole grid of parameter points in one batched pass.
+    
+    a, b, pA and num_simulations broadcast against each other; each entry of
+    the broadcast result is one parameter point. All games of all points are
+    laid out as lanes of a single _simulate_batch call with per-lane
+    boundaries and probabilities, so the per-point setup cost is paid once.
+    
+    With common_random_numbers=True (all points need the same
+    num_simulations), game j of every point is driven by the same uniforms,
+    so differences between points have low variance. Each row then also
+    reports the variance-reduction factor of its difference from the
+    previous row, relative to independent sampling.
+    
+    Returns:
+    --------
+    List of dicts (one row per parameter point) with keys:
+        - a, b, pA, num_simulations: The parameter point
+        - P_ruin_A_sim, P_ruin_A_theory: Simulated and theoretical P(ruin of A)
+        - avg_rounds_sim, avg_rounds_theory: Simulated and theoretical E[L]
+        - LMIN, LMAX: Shortest and longest simulated game
+        - truncated: Number of games stopped at max_rounds
+        - crn_factor_P_ruin_A, crn_factor_avg_rounds: Variance-reduction
+          factors of the difference to the previous row (only with
+          common_random_numbers; None in the first row)
+    """
+    a, b, pA, num_simulations = (np.ravel(x) for x in np.broadcast_arrays(a, b, pA, num_simulations))
+    num_simulations = num_simulations.astype(np.int64)
+    if np.any(num_simulations <= 0):
+        raise ValueError("num_simulations must be positive for every point")
+    
+    if common_random_numbers and np.any(num_simulations != num_simulations[0]):
+        raise ValueError("common_random_numbers needs the same num_simulations for every point")
+    
+    point = np.repeat(np.arange(a.size), num_simulations)
+    uniform_stream = np.tile(np.arange(num_simulations[0]), a.size) if common_random_numbers else None
+    rng = None if seed is None else np.random.default_rng(seed)
+    final_capital, num_rounds = _simulate_batch(a[point], b[point], pA[point], point.size, max_rounds, rng,
+                                                uniform_stream)
+    
+    # Lanes of one point are contiguous, so per-point reductions can use reduceat
+    starts = np.concatenate(([0], np.cumsum(num_simulations)[:-1]))
+    ruined = np.add.reduceat((final_capital <= 0).astype(np.int64), starts)
+    truncated = np.add.reduceat(((final_capital > 0) & (final_capital < (a + b)[point])).astype(np.int64), starts)
+    sum_rounds = np.add.reduceat(num_rounds, starts)
+    LMIN = np.minimum.reduceat(num_rounds, starts)
+    LMAX = np.maximum.reduceat(num_rounds, starts)
+    
+    theory = theoretical_duration_moments(a, b, pA)
+    P_theory = np.atleast_1d(theory['P_ruin_A'])
+    E_theory = np.atleast_1d(theory['expected_rounds'])
+    
+    rows = [
+        {
+            'a': a[i].item(),
+            'b': b[i].item(),
+            'pA': pA[i].item(),
+            'num_simulations': int(num_simulations[i]),
+            'P_ruin_A_sim': float(ruined[i] / num_simulations[i]),
+            'P_ruin_A_theory': float(P_theory[i]),
+            'avg_rounds_sim': float(sum_rounds[i] / num_simulations[i]),
+            'avg_rounds_theory': float(E_theory[i]),
+            'LMIN': int(LMIN[i]),
+            'LMAX': int(LMAX[i]),
+            'truncated': int(truncated[i])
+        }
+        for i in range(a.size)
+    ]
+    
+    if common_random_numbers:
+        ruined_games = (final_capital <= 0).reshape(a.size, -1).astype(float)
+        rounds_games = num_rounds.reshape(a.size, -1).astype(float)
+        rows[0]['crn_factor_P_ruin_A'] = None
+        rows[0]['crn_factor_avg_rounds'] = None
+        for i in range(1, a.size):
+            for key, games in (('crn_factor_P_ruin_A', ruined_games), ('crn_factor_avg_rounds', rounds_games)):
+                independent = games[i].var(ddof=1) + games[i - 1].var(ddof=1)
+                rows[i][key] = _variance_ratio(independent, (games[i] - games[i - 1]).var(ddof=1))
+    
+    return rows
+
+
+def _propagate_mass(mass: np.ndarray, pA: float) -> np.ndarray:
+    """
+    Advance a probability vector over A's capital 0..a+b by one round.
+    States 0 and a+b are absorbing; every interior state k moves to k+1 with
+    probability pA and to k-1 with probability 1-pA.
+    """
+    new_mass = np.zeros_like(mass)
+    new_mass[0] = mass[0]
+    new_mass[-1] = mass[-1]
+    new_mass[2:] += pA * mass[1:-1]
+    new_mass[:-2] += (1 - pA) * mass[1:-1]
+    return new_mass
+
+
+def theoretical_duration_distribution(a: int, b: int, pA: float, max_n: int) -> Dict:
+    """
+    Calculate the exact distribution of the game duration L for n = 0..max_n.
+    
+    The probability mass over A's capital is pushed forward one round at a
+    time through the absorbing chain; the mass entering state 0 (or a+b) at
+    round n is P(L = n, A ruined) (or P(L = n, B ruined)). The cost is
+    O((a+b) * max_n), with no sampling error.
+    
+    Returns:
+    --------
+    Dict with keys (all NumPy arrays indexed by n = 0..max_n):
+        - n: Round numbers
+        - pmf: P(L = n)
+        - cdf: P(L <= n)
+        - survival: P(L > n)
+        - pmf_ruin_A: P(L = n and A goes bankrupt)
+        - pmf_ruin_B: P(L = n and B goes bankrupt)
+    """
+    total = a + b
+    mass = np.zeros(total + 1)
+    mass[a] = 1.0
+    
+    # Track the newly absorbed and surviving mass directly rather than by
+    # differencing cumulative sums, so the tail keeps its relative precision
+    pmf_ruin_A = np.zeros(max_n + 1)
+    pmf_ruin_B = np.zeros(max_n + 1)
+    survival = np.zeros(max_n + 1)
+    pmf_ruin_A[0] = mass[0]
+    pmf_ruin_B[0] = mass[-1]
+    survival[0] = mass[1:-1].sum()
+    mass[0] = 0.0
+    mass[-1] = 0.0
+    
+    for n in range(1, max_n + 1):
+        pmf_ruin_A[n] = (1 - pA) * mass[1]
+        pmf_ruin_B[n] = pA * mass[-2]
+        mass = _propagate_mass(mass, pA)
+        mass[0] = 0.0
+        mass[-1] = 0.0
+        survival[n] = mass[1:-1].sum()
+    
+    pmf = pmf_ruin_A + pmf_ruin_B
+    
+    return {
+        'n': np.arange(max_n + 1),
+        'pmf': pmf,
+        'cdf': 1 - survival,
+        'survival': survival,
+        'pmf_ruin_A': pmf_ruin_A,
+        'pmf_ruin_B': pmf_ruin_B
+    }
+
+
+# Relative accuracy the spectral P(L > n) must provably reach, else the
+# exact sweep is used; the sweep costs O((a+b) * n) and is refused above
+# SURVIVAL_MAX_SWEEP state updates
+SURVIVAL_RTOL = 1e-9
+SURVIVAL_MAX_SWEEP = 2 * 10**8
+
+
+def theoretical_survival(a: int, b: int, pA: float, n) -> np.ndarray:
+    """
+    Calculate P(L > n) for one or many n from the spectral decomposition.
+    
+    On the interior states 1..a+b-1 the walk has eigenvalues
+    lambda_v = 2 sqrt(pq) cos(pi v / (a+b)), v = 1..a+b-1, so
+    P(L > n) = sum_v c_v lambda_v^n with coefficients c_v that only depend
+    on a, b and pA: each query costs O(a+b). The spectral sum cancels badly
+    for small n in strongly biased games; n whose rounding error bound is not
+    within SURVIVAL_RTOL of the result fall back to
+    theoretical_duration_distribution, and a ValueError is raised if that
+    sweep would exceed SURVIVAL_MAX_SWEEP state updates.
+    
+    Returns:
+    --------
+    np.ndarray of P(L > n) with the shape of n (float for scalar n)
+    """
+    scalar = np.ndim(n) == 0
+    n = np.atleast_1d(np.asarray(n, dtype=np.int64))
+    total = a + b
+    if not 0 < a < total:
+        survival = np.zeros(n.shape)
+        return float(survival[0]) if scalar else survival
+    
+    fallback = np.ones(n.shape, dtype=bool)
+    survival = np.zeros(n.shape)
+    if 0 < pA < 1:
+        # Mirror so that rho = sqrt(p/q) <= 1; L is unchanged by (a, b, p) -> (b, a, q)
+        k, p = (b, 1 - pA) if pA > 0.5 else (a, pA)
+        q = 1 - p
+        rho = np.sqrt(p / q)
+        theta = np.pi * np.arange(1, total) / total
+        
+        # sum_j rho^(j-k) sin(theta j), split into j >= k and j < k geometric
+        # series and scaled by rho^k (the j < k part grows like rho^-k)
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore', under='ignore'):
+            z = rho * np.exp(1j * theta)
+            w = 1 / z
+            tail = (rho**k * (1 - z**(total - k)) / (1 - z)
+                    + (rho**(k - 1) * np.exp(-1j * theta) - np.exp(-1j * theta * k)) / (1 - w))
+            coefficients = 2 / total * np.sin(theta * k) * np.imag(np.exp(1j * theta * k) * tail)
+            # Coefficients and powers are combined in log space, so neither
+            # rho^-k nor lambda^n overflows or underflows on its own
+            log_coefficients = np.log(np.abs(coefficients)) - k * np.log(rho)
             
-            if np.random.random() < pA:
-                capital_A += 1
-                capital_B -= 1
-            else:
-                capital_A -= 1
-                capital_B += 1
+            eigenvalues = 2 * np.sqrt(p * q) * np.cos(theta)
+            log_abs = np.log(np.abs(eigenvalues))
+            sign = np.sign(coefficients)
+            negative = eigenvalues < 0
+            
+            for start in range(0, n.size, 4096):
+                block = n[start:start + 4096, None]
+                terms = (sign * np.where(negative & (block % 2 == 1), -1.0, 1.0)
+                         * np.exp(log_coefficients + block * log_abs))
+                survival[start:start + 4096] = terms.sum(axis=1)
+                # Rounding error of the sum is bounded by eps * sum |terms|;
+                # fall back where it exceeds SURVIVAL_RTOL of the result
+                error = 4 * np.finfo(float).eps * total * np.abs(terms).sum(axis=1)
+                bound = SURVIVAL_RTOL * np.maximum(np.abs(survival[start:start + 4096]), 1e-300)
+                fallback[start:start + 4096] = ~(error <= bound) | (block[:, 0] < 0)
+    
+    if fallback.any():
+        horizon = int(max(n[fallback].max(), 0))
+        if (total + 1) * horizon > SURVIVAL_MAX_SWEEP:
+            raise ValueError(f"P(L > n) for a={a}, b={b}, pA={pA} up to n={horizon} is beyond the spectral "
+                             f"sum's precision and the exact sweep would take {(total + 1) * horizon:.2g} "
+                             f"state updates (limit SURVIVAL_MAX_SWEEP = {SURVIVAL_MAX_SWEEP:.2g})")
+        exact = theoretical_duration_distribution(a, b, pA, horizon)['survival']
+        survival[fallback] = np.where(n[fallback] < 0, 1.0, exact[np.clip(n[fallback], 0, horizon)])
+    
+    survival = np.clip(survival, 0.0, 1.0)
+    return float(survival[0]) if scalar else survival
+
+
+def theoretical_LMAX(a: int, b: int, pA: float, m: int,
+                     quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95)) -> Dict:
+    """
+    Calculate the distribution of LMAX, the longest of m independent games.
+    
+    P(LMAX <= n) = (1 - P(L > n))^m with P(L > n) from theoretical_survival,
+    which costs O(a+b) per n, so nothing is evaluated densely:
+    - E[LMAX] = sum_n P(LMAX > n) is summed per parity of n (within each,
+      P(L > n) is a sum of exponentials, hence smooth) over blocks of
+      consecutive n, each weighted by its centre: blocks are single rounds
+      early on and grow to 1/64 of the current n, capped at 1/64 of the
+      decay length of the dominant eigenvalue. They reach a horizon where
+      m * P(L > n) < 1e-12, and past it the sum is closed analytically with
+      that eigenvalue's geometric tail.
+    - Quantiles (and the median) are bracketed by the block centres and
+      then found exactly by bisection, all levels together.
+    Raises theoretical_survival's ValueError for games it refuses.
+    
+    Returns:
+    --------
+    Dict with keys:
+        - expected_LMAX: E[LMAX]
+        - median_LMAX: Median of LMAX
+        - quantiles: Dict mapping each requested quantile to its value of LMAX
+        - n, cdf: Arrays with P(LMAX <= n) on the grid of block centres
+    """
+    def exceed(n: np.ndarray) -> np.ndarray:
+        """P(LMAX > n)."""
+        with np.errstate(divide='ignore'):
+            return -np.expm1(m * np.log1p(-theoretical_survival(a, b, pA, n)))
+    
+    # Find a horizon beyond which P(LMAX > n) is negligible
+    horizon = max(int(theoretical_expected_rounds(a, b, pA)), 16)
+    while m * theoretical_survival(a, b, pA, horizon) >= 1e-12:
+        horizon *= 2
+    
+    # Blocks of pair indices x (rounds 2x and 2x + 1), each of an odd width
+    # so that its centre is a pair index
+    decay = (2 * np.sqrt(pA * (1 - pA)) * np.cos(np.pi / (a + b))) ** 2  # Per pair of rounds
+    scale = -1 / np.log(decay) if 0 < decay < 1 else 0.0
+    centres, widths = [], []
+    x = 0
+    while 2 * x <= horizon:
+        width = int(min(x, scale) / 64) | 1
+        centres.append(x + width // 2)
+        widths.append(width)
+        x += width
+    centres = np.array(centres, dtype=np.int64)
+    widths = np.array(widths, dtype=np.int64)
+    
+    n = np.concatenate([2 * centres, 2 * centres + 1])
+    tail = exceed(n)
+    expected = float(np.dot(np.tile(widths, 2), tail))
+    # Beyond the last block P(LMAX > n) ~ m P(L > n) decays geometrically
+    if 0 < decay < 1:
+        last = np.array([centres.size - 1, 2 * centres.size - 1])
+        expected += float(tail[last].sum() * decay ** (x - centres[-1]) / (1 - decay))
+    
+    order = np.argsort(n)
+    n, cdf = n[order], 1 - tail[order]
+    
+    # Smallest n with P(LMAX <= n) >= level (up to rounding), bisecting
+    # between the grid points around it; P(LMAX <= -1) = 0
+    levels = np.array(sorted(set(quantiles) | {0.5}), dtype=float) - 1e-12
+    index = np.searchsorted(cdf, levels)
+    high = n[np.minimum(index, n.size - 1)]
+    low = np.where(index > 0, n[np.maximum(index - 1, 0)], -1)
+    while np.any(high - low > 1):
+        middle = (low + high) // 2
+        below = 1 - exceed(middle) < levels
+        low, high = np.where(below, middle, low), np.where(below, high, middle)
+    quantile = {float(level): int(value) for level, value in zip(levels + 1e-12, high)}
+    
+    return {
+        'expected_LMAX': expected,
+        'median_LMAX': quantile[0.5],
+        'quantiles': {level: quantile[float(level)] for level in quantiles},
+        'n': n,
+        'cdf': cdf
+    }
+
+
+def theoretical_capital_distribution(a: int, b: int, pA: float, N_values: List[int]) -> Dict:
+    """
+    Calculate the exact distribution P(k) of A's capital after N rounds.
+    
+    A single forward sweep of the absorbing chain up to max(N_values) yields
+    the distribution for every requested N. States 0 and a+b keep the mass of
+    games that ended before round N, matching simulate_capital_after_N_rounds.
+    
+    Returns:
+    --------
+    Dict with keys:
+        - N: Array of the requested round counts
+        - k: Array of capital values 0..a+b
+        - P_k: Array of shape (len(N_values), a+b+1) with P(k) for each N
+        - P_ruin_A: Probability that A went bankrupt within N rounds
+        - P_ruin_B: Probability that B went bankrupt within N rounds
+    """
+    total = a + b
+    N_values = np.asarray(N_values, dtype=int)
+    mass = np.zeros(total + 1)
+    mass[a] = 1.0
+    
+    P_k = np.zeros((len(N_values), total + 1))
+    order = np.argsort(N_values)
+    n = 0
+    for idx in order:
+        while n < N_values[idx]:
+            mass = _propagate_mass(mass, pA)
+            n += 1
+        P_k[idx] = mass
+    
+    return {
+        'N': N_values,
+        'k': np.arange(total + 1),
+        'P_k': P_k,
+        'P_ruin_A': P_k[:, 0].copy(),
+        'P_ruin_B': P_k[:, -1].copy()
+    }
+
+
+def simulate_game_with_wins(a: int, b: int, pA: float, max_rounds: int = 100000,
+                            compact: bool = False,
+                            backend: Optional[str] = None) -> Tuple[bool, int, List[int], List[int]]:
+    """
+    Simulate a single Gambler's Ruin game and track wins.
+    
+    With compact=True, capital_history and wins_history are Trajectory views
+    sharing one packed bit array instead of Python lists.
+    backend selects the simulation backend (see get_backend).
+    
+    Returns:
+    --------
+    Tuple[bool, int, List[int], List[int]]
+        (A_wins, num_rounds, capital_history, wins_history)
+        - A_wins: True if A wins, False if B wins
+        - num_rounds: Number of rounds until game ends
+        - capital_history: List of A's capital after each round
+        - wins_history: List of cumulative wins for A after each round
+    """
+    A_wins, rounds, won = get_backend(backend).game_steps(a, b, pA, max_rounds)
+    if compact:
+        trajectory = Trajectory.from_rounds(won, a)
+        return A_wins, rounds, trajectory, trajectory.as_wins()
+    
+    wins = np.concatenate(([0], np.cumsum(won)))
+    capital_history = (a + 2 * wins - np.arange(rounds + 1)).tolist()
+    wins_history = wins.tolist()
+    return A_wins, rounds, capital_history, wins_history
+
+
+def _simulate_capital_batch(a: int, b: int, pA: float, N: int, num_simulations: int,
+                            rng=None) -> np.ndarray:
+    """
+    Advance num_simulations games for N rounds in lockstep and return A's
+    capital in each (games that ended early keep their absorbing value).
+    """
+    steps = StepSource(pA, rng)
+    total = a + b
+    final_capital = np.full(num_simulations, a, dtype=np.int64)
+    
+    if 0 < a < total:
+        active = np.arange(num_simulations)
+    else:
+        active = np.arange(0)
+    capital = final_capital[active]
+    rounds = 0
+    
+    for _ in range(N):
+        if active.size == 0:
+            break
+        capital += np.where(steps.draw(active.size), 1, -1)
+        rounds += active.size
         
-        final_capitals.append(capital_A)
+        finished = (capital <= 0) | (capital >= total)
+        if finished.any():
+            final_capital[active[finished]] = capital[finished]
+            active = active[~finished]
+            capital = capital[~finished]
     
-    return final_capitals
+    final_capital[active] = capital
+    # Games still running at N rounds are not truncated: N is the horizon asked for
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=rounds, rng_draws=steps.words)
+    return final_capital
+
+
+def simulate_capital_after_N_rounds(a: int, b: int, pA: float, N: int, num_simulations: int = 10000,
+                                    seed: Optional[int] = None, workers: Optional[int] = None,
+                                    chunk_size: Optional[int] = None,
+                                    backend: Optional[str] = None,
+                                    distribution: bool = False) -> List[int]:
+    """
+    Simulate capital of player A after N rounds (game may continue or end before N).
+    
+    seed, workers, chunk_size and backend work as in simulate_multiple_games.
+    With distribution=True each chunk is counted as soon as it is simulated
+    and a Distribution of the capitals is returned instead of the list.
+    
+    Returns:
+    --------
+    List of final capital values after N rounds (or when game ended)
+    """
+    capital_batch = get_backend(backend).capital_batch
+    if seed is None and workers is None and chunk_size is None:
+        final_capitals = capital_batch(a, b, pA, N, num_simulations)
+    else:
+        kwargs = {'a': a, 'b': b, 'pA': pA, 'N': N}
+        if distribution:
+            capitals = Distribution.from_values([])
+            for chunk in _iter_chunks(capital_batch, kwargs, num_simulations, seed, workers, chunk_size):
+                capitals.update(chunk)
+            return capitals
+        chunks = _run_chunked(capital_batch, kwargs, num_simulations, seed, workers, chunk_size)
+        final_capitals = np.concatenate(chunks)
+    
+    if distribution:
+        return Distribution.from_values(final_capitals)
+    return final_capitals.tolist()
+
+
+# ---------------------------------------------------------------------------
+# Batched trajectories
+# ---------------------------------------------------------------------------
+
+def _simulate_trajectory_batch(a: int, b: int, pA: float, num_simulations: int,
+                               num_rounds: Optional[int] = None, max_rounds: int = 100000,
+                               rng=None, block_size: int = 256) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simulate num_simulations whole trajectories as padded 2-D arrays.
+    
+    Rounds are drawn in blocks of block_size for all unfinished games at
+    once; within a block every row is frozen from the round its game is
+    absorbed, so each game keeps its absorbing capital and final win count
+    to the right edge. num_rounds fixes the width (games still running there
+    are cut off); None plays every game out (up to max_rounds) and makes the
+    arrays as wide as the longest game.
+    
+    Both arrays use the narrowest unsigned dtype holding a + b and the
+    width, and blocks are stored narrow as they are produced: straight into
+    the output when the width is fixed, otherwise as blocks joined once the
+    width is known. Peak memory therefore stays within about twice the
+    output rather than growing with int64 intermediates.
+    
+    Returns:
+    --------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        (capital, wins, rounds_played)
+        - capital, wins: Shape (num_simulations, width + 1), column t holds
+          A's capital and cumulative wins after round t
+        - rounds_played: Rounds each game lasted within the width
+    """
+    steps = StepSource(pA, rng)
+    total = a + b
+    horizon = max_rounds if num_rounds is None else num_rounds
+    capital = np.full(num_simulations, a, dtype=np.int64)
+    wins = np.zeros(num_simulations, dtype=np.int64)
+    rounds_played = np.zeros(num_simulations, dtype=np.int64)
+    running = np.full(num_simulations, 0 < a < total)
+    
+    capital_blocks, wins_blocks = [], []
+    if num_rounds is not None:
+        dtype = np.min_scalar_type(max(total, num_rounds))
+        capital_out = np.empty((num_simulations, num_rounds + 1), dtype=dtype)
+        wins_out = np.empty_like(capital_out)
+    
+    def record(column: int, capital_block: np.ndarray, wins_block: np.ndarray) -> None:
+        """Store columns column.. of both series in a narrow dtype."""
+        if num_rounds is not None:
+            capital_out[:, column:column + capital_block.shape[1]] = capital_block
+            wins_out[:, column:column + wins_block.shape[1]] = wins_block
+        else:
+            # Every value so far is at most a + b or the longest game so far
+            narrow = np.min_scalar_type(max(total, int(rounds_played.max(initial=0))))
+            capital_blocks.append(capital_block.astype(narrow))
+            wins_blocks.append(wins_block.astype(narrow))
+    
+    record(0, capital[:, None], wins[:, None])
+    rounds = 0
+    while rounds < horizon and (running.any() or num_rounds is not None):
+        size = min(block_size, horizon - rounds)
+        capital_block = np.repeat(capital[:, None], size, axis=1)
+        wins_block = np.repeat(wins[:, None], size, axis=1)
+        
+        active = np.flatnonzero(running)
+        if active.size > 0:
+            won = steps.draw((active.size, size))
+            path = capital[active, None] + np.cumsum(np.where(won, 1, -1), axis=1)
+            absorbed = np.logical_or.accumulate((path <= 0) | (path >= total), axis=1)
+            # A round is played if the game was not absorbed before it
+            played = np.ones_like(absorbed)
+            played[:, 1:] = ~absorbed[:, :-1]
+            
+            capital_block[active] = capital[active, None] + np.cumsum(np.where(won, 1, -1) * played, axis=1)
+            wins_block[active] = wins[active, None] + np.cumsum(won & played, axis=1)
+            rounds_played[active] += played.sum(axis=1)
+            running[active] = ~absorbed[:, -1]
+            capital[active] = capital_block[active, -1]
+            wins[active] = wins_block[active, -1]
+        
+        record(rounds + 1, capital_block, wins_block)
+        rounds += size
+    
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=rounds_played.sum(), rng_draws=steps.words,
+                               truncated=running.sum() if num_rounds is None else 0)
+    
+    if num_rounds is not None:
+        return capital_out, wins_out, rounds_played
+    
+    # Drop the padding of the last block past the longest game
+    width = int(rounds_played.max(initial=0))
+    padding = rounds - width
+    if padding > 0:
+        capital_blocks[-1] = capital_blocks[-1][:, :-padding]
+        wins_blocks[-1] = wins_blocks[-1][:, :-padding]
+    dtype = np.min_scalar_type(max(total, width))
+    return (np.concatenate(capital_blocks, axis=1, dtype=dtype),
+            np.concatenate(wins_blocks, axis=1, dtype=dtype), rounds_played)
+
+
+def simulate_trajectories(a: int, b: int, pA: float, num_simulations: int = 1000,
+                          num_rounds: Optional[int] = None, max_rounds: int = 100000,
+                          seed: Optional[int] = None) -> Dict:
+    """
+    Simulate many games and return their trajectories as padded 2-D arrays.
+    
+    Row i holds game i; after a game ends its row repeats the absorbing
+    capital and the final number of wins, so every row has the same width
+    and per-round statistics (e.g. np.quantile(wins, 0.5, axis=0)) need no
+    masking. For bands over many games without keeping the arrays, see
+    trajectory_bands.
+    
+    Parameters:
+    -----------
+    num_rounds : int, optional
+        Number of rounds to record (games still running are cut off there);
+        None records every game to its end (at most max_rounds)
+    seed : int, optional
+        Seed for a np.random.Generator (None uses the global np.random state)
+    
+    Returns:
+    --------
+    Dict with keys:
+        - capital: Array (num_simulations, width + 1) of A's capital after each round
+        - wins: Array (num_simulations, width + 1) of A's cumulative wins
+        - num_rounds: Rounds played by each game within the recorded width
+        - finished: True where the game ended within the recorded width
+        - A_wins: True where A won (A's capital reached a + b)
+    """
+    rng = None if seed is None else np.random.default_rng(seed)
+    capital, wins, rounds_played = _simulate_trajectory_batch(a, b, pA, num_simulations, num_rounds, max_rounds, rng)
+    final_capital = capital[:, -1]
+    return {
+        'capital': capital,
+        'wins': wins,
+        'num_rounds': rounds_played,
+        'finished': (final_capital == 0) | (final_capital == a + b),
+        'A_wins': final_capital == a + b
+    }
+
+
+class TrajectoryBands:
+    """
+    Constant-memory, mergeable per-round distribution of a trajectory series.
+    
+    Keeps, for every round t = 0..num_rounds, a histogram of an integer
+    series with values in [0, max_value] (A's capital: max_value = a + b;
+    cumulative wins: max_value = num_rounds). Per-round quantiles are read
+    from the histograms exactly, so bands over any number of games cost
+    O(num_rounds * max_value) memory; two accumulators with the same
+    settings can be combined with merge().
+    """
+    
+    def __init__(self, num_rounds: int, max_value: int):
+        self.num_rounds = num_rounds
+        self.max_value = max_value
+        self.count = 0
+        self.histogram = np.zeros((num_rounds + 1, max_value + 1), dtype=np.int64)
+    
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of padded trajectories (shape (n, num_rounds + 1))."""
+        values = np.asarray(values, dtype=np.int64)
+        if values.shape[0] == 0:
+            return
+        cells = np.arange(self.num_rounds + 1) * (self.max_value + 1) + values
+        self.histogram += np.bincount(cells.ravel(), minlength=self.histogram.size).reshape(self.histogram.shape)
+        self.count += values.shape[0]
+    
+    def merge(self, other: 'TrajectoryBands') -> 'TrajectoryBands':
+        """Fold another accumulator with the same settings into this one."""
+        if self.histogram.shape != other.histogram.shape:
+            raise ValueError("Cannot merge TrajectoryBands with different num_rounds or max_value")
+        self.histogram += other.histogram
+        self.count += other.count
+        return self
+    
+    @property
+    def rounds(self) -> np.ndarray:
+        return np.arange(self.num_rounds + 1)
+    
+    @property
+    def mean(self) -> np.ndarray:
+        """Mean of the series after every round."""
+        return self.histogram @ np.arange(self.max_value + 1) / self.count
+    
+    def quantile(self, q: float) -> np.ndarray:
+        """q-quantile of the series after every round (lower order statistic)."""
+        rank = q * (self.count - 1)
+        return np.count_nonzero(np.cumsum(self.histogram, axis=1) <= rank, axis=1)
+    
+    def bands(self, quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95)) -> Dict:
+        """Rounds, mean and the requested quantiles as arrays, keyed by q."""
+        bands = {'rounds': self.rounds, 'mean': self.mean}
+        bands.update({q: self.quantile(q) for q in quantiles})
+        return bands
+
+
+def _trajectory_bands_batch(a: int, b: int, pA: float, num_rounds: int, series: str,
+                            num_simulations: int, rng=None) -> TrajectoryBands:
+    capital, wins, _ = _simulate_trajectory_batch(a, b, pA, num_simulations, num_rounds, rng=rng)
+    if series == 'capital':
+        bands = TrajectoryBands(num_rounds, a + b)
+        bands.update(capital)
+    else:
+        bands = TrajectoryBands(num_rounds, num_rounds)
+        bands.update(wins)
+    return bands
+
+
+def trajectory_bands(a: int, b: int, pA: float, num_simulations: int, num_rounds: int,
+                     series: str = 'wins', seed: Optional[int] = None,
+                     workers: Optional[int] = None, chunk_size: int = 1000) -> TrajectoryBands:
+    """
+    Per-round distribution of A's cumulative wins (or capital) over many games.
+    
+    Games are simulated chunk_size at a time and reduced into a
+    TrajectoryBands accumulator, so memory does not grow with
+    num_simulations. seed and workers work as in simulate_multiple_games.
+    
+    Example:
+        bands = trajectory_bands(10, 10, 0.5, 10000, num_rounds=400).bands()
+        ax.fill_between(bands['rounds'], bands[0.05], bands[0.95])
+    """
+    if series not in ('capital', 'wins'):
+        raise ValueError(f"series must be 'capital' or 'wins', got {series!r}")
+    bands = TrajectoryBands(num_rounds, a + b if series == 'capital' else num_rounds)
+    kwargs = {'a': a, 'b': b, 'pA': pA, 'num_rounds': num_rounds, 'series': series}
+    for partial in _iter_chunks(_trajectory_bands_batch, kwargs, num_simulations, seed, workers, chunk_size):
+        bands.merge(partial)
+    return bands
+
+
+def decimate_minmax(x: np.ndarray, y: np.ndarray, num_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a series to about num_points points for plotting, keeping the
+    minimum and maximum of y in each of num_points // 2 equal buckets (in x
+    order), so spikes stay visible.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    num_buckets = max(num_points // 2, 1)
+    if x.size <= num_points:
+        return x, y
+    
+    edges = np.linspace(0, x.size, num_buckets + 1).astype(np.int64)
+    keep = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        bucket = y[start:stop]
+        keep.extend(sorted({start + int(np.argmin(bucket)), start + int(np.argmax(bucket))}))
+    keep = np.array(keep)
+    return x[keep], y[keep]
+
+
+def decimate_lttb(x: np.ndarray, y: np.ndarray, num_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a series to num_points points with Largest-Triangle-Three-Buckets
+    (Steinarsson, 2013): keeps the first and last points and, in each bucket
+    in between, the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket. Preserves the visual shape
+    better than min/max for smooth series.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if num_points >= x.size or num_points < 3:
+        return x, y
+    
+    xf, yf = x.astype(float), y.astype(float)
+    edges = np.linspace(1, x.size - 1, num_points - 1).astype(np.int64)
+    keep = np.empty(num_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, x.size - 1
+    for i in range(num_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = xf[stop:edges[i + 2]].mean(), yf[stop:edges[i + 2]].mean()
+        else:
+            next_x, next_y = xf[-1], yf[-1]
+        prev_x, prev_y = xf[keep[i]], yf[keep[i]]
+        area = np.abs((prev_x - next_x) * (yf[start:stop] - prev_y) - (prev_x - xf[start:stop]) * (next_y - prev_y))
+        keep[i + 1] = start + int(np.argmax(area))
+    return x[keep], y[keep]
+
+
+# ---------------------------------------------------------------------------
+# Simulation backends
+# ---------------------------------------------------------------------------
+
+class SimulationBackend:
+    """
+    A named set of simulation kernels the public entry points dispatch through.
+    
+    Every backend implements the same three kernels with the signatures of
+    the NumPy ones:
+    - game_steps(a, b, pA, max_rounds, rng) -> (A_wins, num_rounds, A_won_round)
+    - batch(a, b, pA, num_simulations, max_rounds, rng) -> (final_capital, num_rounds)
+    - capital_batch(a, b, pA, N, num_simulations, rng) -> final_capital
+    
+    rng is a np.random.Generator, or None for the global np.random state.
+    Kernels must be module-level functions so they can be sent to worker
+    processes.
+    """
+    
+    def __init__(self, name: str, game_steps: Callable, batch: Callable, capital_batch: Callable):
+        self.name = name
+        self.game_steps = game_steps
+        self.batch = batch
+        self.capital_batch = capital_batch
+    
+    def __repr__(self) -> str:
+        return f"SimulationBackend({self.name!r})"
+
+
+_BACKENDS: Dict[str, SimulationBackend] = {}
+
+BACKEND_ENV_VAR = 'GAMBLER_RUIN_BACKEND'
+
+
+def register_backend(backend: SimulationBackend) -> None:
+    """Register (or replace) a simulation backend under backend.name."""
+    _BACKENDS[backend.name] = backend
+
+
+def available_backends() -> List[str]:
+    """Names of the backends usable on this host."""
+    return list(_BACKENDS)
+
+
+def get_backend(name: Optional[str] = None) -> SimulationBackend:
+    """
+    Resolve a simulation backend.
+    
+    name defaults to the GAMBLER_RUIN_BACKEND environment variable, then to
+    'numpy'. 'auto' picks the fastest backend available on this host
+    ('numba' if Numba is importable, else 'numpy').
+    """
+    if name is None:
+        name = os.environ.get(BACKEND_ENV_VAR) or 'numpy'
+    if name == 'auto':
+        name = 'numba' if 'numba' in _BACKENDS else 'numpy'
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown or unavailable backend {name!r}; available: {available_backends()}")
+    return _BACKENDS[name]
+
+
+def _reference_walk(a: int, b: int, pA: float, max_rounds: int, rng) -> Tuple[int, List[bool]]:
+    """Play one game round by round in plain Python (the original loop, kept as the oracle)."""
+    capital_A = a
+    capital_B = b
+    won = []
+    
+    while capital_A > 0 and capital_B > 0 and len(won) < max_rounds:
+        if rng.random() < pA:
+            capital_A += 1
+            capital_B -= 1
+            won.append(True)
+        else:
+            capital_A -= 1
+            capital_B += 1
+            won.append(False)
+    
+    return capital_A, won
+
+
+def _reference_game_steps(a: int, b: int, pA: float, max_rounds: int = 100000,
+                          rng=None) -> Tuple[bool, int, np.ndarray]:
+    rng = np.random if rng is None else rng
+    capital, won = _reference_walk(a, b, pA, max_rounds, rng)
+    if _instrumentation is not None:
+        _instrumentation.count(games=1, rounds=len(won), rng_draws=len(won), truncated=0 < capital < a + b)
+    return capital > 0, len(won), np.array(won, dtype=bool)
+
+
+def _reference_batch(a: int, b: int, pA: float, num_simulations: int,
+                     max_rounds: int = 100000, rng=None) -> Tuple[np.ndarray, np.ndarray]:
+    """Play num_simulations reference games one after another."""
+    rng = np.random if rng is None else rng
+    final_capital = np.empty(num_simulations, dtype=np.int64)
+    num_rounds = np.empty(num_simulations, dtype=np.int64)
+    for i in range(num_simulations):
+        capital, won = _reference_walk(a, b, pA, max_rounds, rng)
+        final_capital[i] = capital
+        num_rounds[i] = len(won)
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=num_rounds.sum(), rng_draws=num_rounds.sum(),
+                               truncated=((final_capital > 0) & (final_capital < a + b)).sum())
+    return final_capital, num_rounds
+
+
+def _reference_capital_batch(a: int, b: int, pA: float, N: int, num_simulations: int,
+                             rng=None) -> np.ndarray:
+    """A's capital after N rounds: reference games cut off at N rounds."""
+    rng = np.random if rng is None else rng
+    final_capital = np.empty(num_simulations, dtype=np.int64)
+    rounds = 0
+    for i in range(num_simulations):
+        final_capital[i], won = _reference_walk(a, b, pA, N, rng)
+        rounds += len(won)
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=rounds, rng_draws=rounds)
+    return final_capital
+
+
+register_backend(SimulationBackend('reference', _reference_game_steps, _reference_batch, _reference_capital_batch))
+register_backend(SimulationBackend('numpy', _simulate_game_steps, _simulate_batch, _simulate_capital_batch))
+
+
+# Binomial leap-ahead. While A's capital x is at distance d = min(x, a+b-x)
+# from the nearer barrier, the next d - 1 rounds cannot end the game, so A's
+# number of wins among them is exactly Binomial(d - 1, pA) and they can be
+# played with one draw. Leaps shrink as the walk nears a barrier and become
+# single rounds at distance 1, so the hitting time keeps its exact
+# distribution. Cost scales with the number of leaps, not of rounds.
+
+def _leap_walk(a, b, pA, num_simulations: int, max_rounds: Optional[int],
+               rng) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Simulate many games by binomial leaps, one leap per unfinished game per
+    iteration. Games leave the active set as soon as they are absorbed.
+    
+    a, b and pA may be scalars or arrays of length num_simulations.
+    max_rounds=None plays every game to absorption; otherwise no leap goes
+    past max_rounds and games still running there are stopped.
+    
+    Returns:
+    --------
+    Tuple[np.ndarray, np.ndarray, int]
+        (final_capital, num_rounds, number of binomial draws)
+    """
+    rng = np.random if rng is None else rng
+    a = np.broadcast_to(np.asarray(a, dtype=np.int64), (num_simulations,))
+    total = np.broadcast_to(a + np.asarray(b, dtype=np.int64), (num_simulations,))
+    pA = np.broadcast_to(np.asarray(pA, dtype=float), (num_simulations,))
+    final_capital = a.copy()
+    num_rounds = np.zeros(num_simulations, dtype=np.int64)
+    
+    # Compact views of the games that are still running; unlike the lockstep
+    # kernel every game has its own round count
+    active = np.flatnonzero((a > 0) & (a < total))
+    if max_rounds is not None and max_rounds <= 0:
+        active = active[:0]
+    capital = final_capital[active]
+    rounds = num_rounds[active]
+    lane_total = total[active]
+    lane_pA = pA[active]
+    
+    draws = 0
+    while active.size > 0:
+        leap = np.maximum(np.minimum(capital, lane_total - capital) - 1, 1)
+        if max_rounds is not None:
+            leap = np.minimum(leap, max_rounds - rounds)
+        wins = rng.binomial(leap, lane_pA)
+        draws += active.size
+        capital += 2 * wins - leap
+        rounds += leap
+        
+        finished = (capital <= 0) | (capital >= lane_total)
+        if max_rounds is not None:
+            finished |= rounds >= max_rounds
+        if finished.any():
+            final_capital[active[finished]] = capital[finished]
+            num_rounds[active[finished]] = rounds[finished]
+            running = ~finished
+            active = active[running]
+            capital = capital[running]
+            rounds = rounds[running]
+            lane_total = lane_total[running]
+            lane_pA = lane_pA[running]
+    return final_capital, num_rounds, draws
+
+
+def _leap_batch(a, b, pA, num_simulations: int, max_rounds: Optional[int] = None,
+                rng=None) -> Tuple[np.ndarray, np.ndarray]:
+    """Leap-ahead batch kernel; games still running at max_rounds are truncated as in _simulate_batch."""
+    final_capital, num_rounds, draws = _leap_walk(a, b, pA, num_simulations, max_rounds, rng)
+    if _instrumentation is not None:
+        total = np.asarray(a) + np.asarray(b)
+        _instrumentation.count(games=num_simulations, rounds=num_rounds.sum(), rng_draws=draws,
+                               truncated=((final_capital > 0) & (final_capital < total)).sum())
+    return final_capital, num_rounds
+
+
+def _leap_game_steps(a: int, b: int, pA: float, max_rounds: Optional[int] = None,
+                     rng=None) -> Tuple[bool, int, np.ndarray]:
+    """Trajectories need every round, so they are drawn step by step (see _simulate_game_steps)."""
+    if max_rounds is None:
+        max_rounds = np.iinfo(np.int64).max
+    return _simulate_game_steps(a, b, pA, max_rounds, rng)
+
+
+def _leap_capital_batch(a: int, b: int, pA: float, N: int, num_simulations: int,
+                        rng=None) -> np.ndarray:
+    """A's capital after N rounds: leaps never go past round N."""
+    final_capital, num_rounds, draws = _leap_walk(a, b, pA, num_simulations, N, rng)
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=num_rounds.sum(), rng_draws=draws)
+    return final_capital
+
+
+register_backend(SimulationBackend('leap', _leap_game_steps, _leap_batch, _leap_capital_batch))
+
+
+# Numba kernels are written as plain Python and compiled on first use. They
+# draw from the caller's Generator itself (Numba shares its bit generator
+# state), so SeedSequence streams stay independent and a kernel plays the
+# same games as the reference backend given the same Generator.
+
+def _numba_walk_kernel(a, total, pA, max_rounds, rng):
+    won = np.empty(min(max_rounds, 1024), dtype=np.bool_)
+    capital = a
+    rounds = 0
+    while capital > 0 and capital < total and rounds < max_rounds:
+        if rounds == won.size:
+            grown = np.empty(min(2 * won.size, max_rounds), dtype=np.bool_)
+            grown[:rounds] = won
+            won = grown
+        step = rng.random() < pA
+        won[rounds] = step
+        capital += 1 if step else -1
+        rounds += 1
+    return capital, rounds, won[:rounds]
+
+
+def _numba_batch_kernel(a, total, pA, num_simulations, max_rounds, rng):
+    final_capital = np.empty(num_simulations, dtype=np.int64)
+    num_rounds = np.empty(num_simulations, dtype=np.int64)
+    for i in range(num_simulations):
+        capital = a
+        rounds = 0
+        while capital > 0 and capital < total and rounds < max_rounds:
+            capital += 1 if rng.random() < pA else -1
+            rounds += 1
+        final_capital[i] = capital
+        num_rounds[i] = rounds
+    return final_capital, num_rounds
+
+
+_NUMBA_COMPILED: Dict[Callable, Callable] = {}
+
+
+def _numba_compiled(kernel: Callable) -> Callable:
+    """Compile a Numba kernel on first use (once per process)."""
+    if kernel not in _NUMBA_COMPILED:
+        import numba
+        _NUMBA_COMPILED[kernel] = numba.njit(cache=True)(kernel)
+    return _NUMBA_COMPILED[kernel]
+
+
+def _kernel_rng(rng) -> np.random.Generator:
+    """
+    The Generator a Numba kernel draws from: rng itself, or for the global
+    state (None or np.random) a Generator seeded with 128 bits drawn from it.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    legacy = np.random if rng is None else rng
+    return np.random.default_rng(legacy.randint(0, 1 << 32, size=4, dtype=np.uint64))
+
+
+def _numba_game_steps(a: int, b: int, pA: float, max_rounds: int = 100000,
+                      rng=None) -> Tuple[bool, int, np.ndarray]:
+    capital, rounds, won = _numba_compiled(_numba_walk_kernel)(a, a + b, pA, max_rounds, _kernel_rng(rng))
+    if _instrumentation is not None:
+        _instrumentation.count(games=1, rounds=rounds, rng_draws=rounds, truncated=0 < capital < a + b)
+    return capital > 0, int(rounds), won
+
+
+def _numba_batch(a: int, b: int, pA: float, num_simulations: int,
+                 max_rounds: int = 100000, rng=None) -> Tuple[np.ndarray, np.ndarray]:
+    final_capital, num_rounds = _numba_compiled(_numba_batch_kernel)(a, a + b, pA, num_simulations, max_rounds,
+                                                                     _kernel_rng(rng))
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=num_rounds.sum(), rng_draws=num_rounds.sum(),
+                               truncated=((final_capital > 0) & (final_capital < a + b)).sum())
+    return final_capital, num_rounds
+
+
+def _numba_capital_batch(a: int, b: int, pA: float, N: int, num_simulations: int,
+                         rng=None) -> np.ndarray:
+    final_capital, num_rounds = _numba_compiled(_numba_batch_kernel)(a, a + b, pA, num_simulations, N,
+                                                                     _kernel_rng(rng))
+    if _instrumentation is not None:
+        _instrumentation.count(games=num_simulations, rounds=num_rounds.sum(), rng_draws=num_rounds.sum())
+    return final_capital
+
 
+if _NUMBA_AVAILABLE:
+    register_backend(SimulationBackend('numba', _numba_game_steps, _numba_batch, _numba_capital_batch))
@@ -0,0 +1,161 @@
+"""
+Gambler's Ruin Problem - Load Test for the Query Service
+Fires a mix of /theory and /simulate requests at a running service (or one
+it starts itself) with a fixed concurrency and reports latency percentiles,
+then checks that a cheap request with a tight budget is not held up by an
+expensive one arriving in the same batch window
+
+Usage (from tasks1/):
+    python -m load_test --spawn                          # start a service, test it, stop it
+    python -m load_test --port 8765 --requests 5000 --concurrency 100 --simulate-fraction 0.3
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from service import DEFAULT_PORT
+
+
+async def request(host: str, port: int, path: str) -> Tuple[int, Dict]:
+    """GET path and return (status, JSON body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def make_paths(num_requests: int, simulate_fraction: float, games: int, distinct: int,
+               timeout: float, seed: int) -> List[Tuple[str, str]]:
+    """(endpoint, path) pairs drawn from `distinct` parameter points, so repeats hit the caches."""
+    rng = random.Random(seed)
+    points = [(rng.randint(1, 100), rng.randint(1, 100), round(rng.uniform(0.3, 0.7), 2)) for _ in range(distinct)]
+    paths = []
+    for _ in range(num_requests):
+        a, b, pA = rng.choice(points)
+        if rng.random() < simulate_fraction:
+            paths.append(('simulate', f"/simulate?a={a}&b={b}&pA={pA}&n={games}&timeout={timeout}"))
+        else:
+            paths.append(('theory', f"/theory?a={a}&b={b}&pA={pA}"))
+    return paths
+
+
+async def run_load(host: str, port: int, paths: List[Tuple[str, str]], concurrency: int) -> Dict:
+    """Send all requests with at most `concurrency` in flight; return latencies and statuses per endpoint."""
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[int, int]] = {}
+    queue = iter(paths)
+
+    async def client() -> None:
+        for endpoint, path in queue:
+            start = time.perf_counter()
+            try:
+                status, _ = await request(host, port, path)
+            except (ConnectionError, ValueError, IndexError):
+                status = 0
+            latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+            counts = statuses.setdefault(endpoint, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    _, stats = await request(host, port, '/stats')
+    return {'latencies': latencies, 'statuses': statuses, 'elapsed_s': elapsed, 'service': stats}
+
+
+async def run_mixed_cost(host: str, port: int) -> Dict:
+    """
+    Send an expensive (but admissible) simulation and, within the same batch
+    window, a cheap one with a 0.5 s budget; return (status, latency) of each.
+    """
+    async def timed(path: str) -> Tuple[int, float]:
+        start = time.perf_counter()
+        status, _ = await request(host, port, path)
+        return status, time.perf_counter() - start
+
+    expensive = asyncio.ensure_future(timed("/simulate?a=100&b=100&pA=0.5&n=3000&timeout=10"))
+    await asyncio.sleep(0.001)
+    cheap = await timed("/simulate?a=2&b=2&pA=0.5&n=10&timeout=0.5")
+    return {'cheap': cheap, 'expensive': await expensive}
+
+
+def report(results: Dict) -> None:
+    print(f"{'endpoint':<10} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    print("-" * 70)
+    for endpoint, latencies in sorted(results['latencies'].items()):
+        ms = np.array(latencies) * 1000
+        statuses = ' '.join(f"{status}:{count}" for status, count in sorted(results['statuses'][endpoint].items()))
+        print(f"{endpoint:<10} {ms.size:>9} {np.percentile(ms, 50):>9.2f} {np.percentile(ms, 99):>9.2f} "
+              f"{ms.max():>9.2f}  {statuses}")
+    total = sum(len(latencies) for latencies in results['latencies'].values())
+    print(f"\n{total} requests in {results['elapsed_s']:.2f} s ({total / results['elapsed_s']:.0f} req/s)")
+    service = results['service']
+    print(f"Service: {service['simulations']} simulations, {service['coalesced']} coalesced, "
+          f"{service['batches']} batches, theory cache {service['theory_cache']['hits']} hits / "
+          f"{service['theory_cache']['misses']} misses")
+
+
+def report_mixed_cost(results: Dict) -> None:
+    print("\nMixed-cost batch window (cheap request must not wait for the expensive one):")
+    for name, (status, latency) in results.items():
+        print(f"  {name:<10} status {status}, {latency * 1000:.1f} ms")
+
+
+async def wait_until_up(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            await request(host, port, '/health')
+            return
+        except (ConnectionError, OSError):
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Gambler's Ruin query service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--spawn', action='store_true', help="start a service on --port for the test")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--simulate-fraction', type=float, default=0.5)
+    parser.add_argument('--games', type=int, default=2000, help="games per simulate request")
+    parser.add_argument('--distinct', type=int, default=50, help="number of distinct (a, b, pA) points")
+    parser.add_argument('--timeout', type=float, default=10.0, help="time budget sent with simulate requests")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, '-m', 'service', '--host', args.host, '--port', str(args.port)],
+                                  stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_until_up(args.host, args.port))
+        paths = make_paths(args.requests, args.simulate_fraction, args.games, args.distinct, args.timeout, args.seed)
+        report(asyncio.run(run_load(args.host, args.port, paths, args.concurrency)))
+        mixed = asyncio.run(run_mixed_cost(args.host, args.port))
+        report_mixed_cost(mixed)
+        if mixed['cheap'][0] != 200:
+            return 1
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
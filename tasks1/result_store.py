@@ -0,0 +1,148 @@
+"""
+Gambler's Ruin Problem - Disk-Backed Result Store
+Keeps simulated games across runs, so re-running a task costs nothing and
+asking for more games simulates only the missing ones
+"""
+
+import os
+import json
+import hashlib
+import inspect
+import numpy as np
+from typing import Dict, List, Optional
+import gambler_ruin
+
+# Bump when the on-disk layout changes
+STORE_FORMAT = 2
+
+
+def code_version() -> str:
+    """
+    Fingerprint of the simulation code: a hash of the gambler_ruin source.
+    Any change to the module invalidates stored results rather than risking
+    games that the current code would not reproduce.
+    """
+    source = inspect.getsource(gambler_ruin).encode()
+    return hashlib.sha1(source + f"format={STORE_FORMAT}".encode()).hexdigest()[:16]
+
+
+class ResultStore:
+    """
+    Directory of stored simulation results, one entry per key.
+
+    A key is a dict of everything the results depend on (function, a, b,
+    pA, N, max_rounds, seed lineage, backend, code version); its entry is a
+    directory named after a hash of the key, holding:
+    - one <name>.<generation>.npy file per per-game array (loaded
+      memory-mapped, read-only)
+    - histogram.<generation>.npy: counts of the durations L (index = L)
+    - meta.json: the key, the generation, the number of games and the
+      sufficient statistics (ruin count, truncations, sum of L and of L^2)
+
+    A save writes the arrays of a new generation next to the current ones
+    and then replaces meta.json, which is what switches readers over, so an
+    interrupted run leaves the previous state intact; only afterwards are
+    the old generation's files removed. load() also checks every array
+    against meta.json's number of games and treats a mismatch as a miss.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, key: Dict) -> str:
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.directory, key['function'], digest)
+
+    @staticmethod
+    def _meta(entry: str) -> Optional[Dict]:
+        meta_path = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def load(self, key: Dict) -> Optional[Dict[str, np.ndarray]]:
+        """
+        The stored arrays of key (memory-mapped), or None if nothing
+        (consistent) is stored.
+        """
+        entry = self._entry(key)
+        meta = self._meta(entry)
+        if meta is None:
+            return None
+        try:
+            arrays = {name: np.load(os.path.join(entry, f"{name}.{meta['generation']}.npy"), mmap_mode='r')
+                      for name in meta['arrays']}
+        except (OSError, ValueError):
+            return None
+        if any(array.shape != (meta['num_games'],) for array in arrays.values()):
+            return None
+        return arrays
+
+    def save(self, key: Dict, final_capital: np.ndarray, num_rounds: np.ndarray) -> None:
+        """Store (replace) the games of key with their sufficient statistics."""
+        entry = self._entry(key)
+        os.makedirs(entry, exist_ok=True)
+        previous = self._meta(entry)
+        generation = 0 if previous is None else previous['generation'] + 1
+        total = key['a'] + key['b']
+        # Stored with the dtypes the simulation kernels return, so loaded games behave like fresh ones
+        arrays = {
+            'final_capital': np.asarray(final_capital, dtype=np.int64),
+            'num_rounds': np.asarray(num_rounds, dtype=np.int64),
+            'histogram': np.bincount(num_rounds)
+        }
+        for name, array in arrays.items():
+            path = os.path.join(entry, f"{name}.{generation}.npy")
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(path + '.tmp', path)
+
+        rounds = num_rounds.astype(np.float64)
+        meta = {
+            'key': key,
+            'generation': generation,
+            'arrays': ['final_capital', 'num_rounds'],
+            'num_games': int(final_capital.size),
+            'ruin_count': int(np.count_nonzero(final_capital <= 0)),
+            'truncated': int(np.count_nonzero((final_capital > 0) & (final_capital < total))),
+            'sum_rounds': float(rounds.sum()),
+            'sum_rounds_sq': float(np.dot(rounds, rounds))
+        }
+        meta_path = os.path.join(entry, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_path + '.tmp', meta_path)
+
+        # Files of older generations (also left behind by interrupted saves)
+        for name in os.listdir(entry):
+            parts = name.split('.')
+            if len(parts) >= 3 and parts[1].isdigit() and int(parts[1]) != generation:
+                try:
+                    os.remove(os.path.join(entry, name))
+                except OSError:
+                    pass
+
+    def histogram(self, key: Dict) -> Optional[np.ndarray]:
+        """Stored duration histogram of key (memory-mapped), or None."""
+        entry = self._entry(key)
+        meta = self._meta(entry)
+        if meta is None:
+            return None
+        path = os.path.join(entry, f"histogram.{meta['generation']}.npy")
+        return np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+    def entries(self) -> List[Dict]:
+        """meta.json of every stored entry: key, number of games and sufficient statistics."""
+        entries = []
+        for function in sorted(os.listdir(self.directory)):
+            function_dir = os.path.join(self.directory, function)
+            if not os.path.isdir(function_dir):
+                continue
+            for digest in sorted(os.listdir(function_dir)):
+                meta_path = os.path.join(function_dir, digest, 'meta.json')
+                if os.path.exists(meta_path):
+                    with open(meta_path) as f:
+                        entries.append(json.load(f))
+        return entries
@@ -0,0 +1,232 @@
+"""
+Gambler's Ruin Problem - Batch Runner
+
+Runs any subset of the task scripts (task_a to task_f) in one process.
+Simulations go through one shared SimulationCache, so games needed by
+several tasks (e.g. a = b = 50 at pA = 0.5 in tasks A, B, C and E) are
+simulated once. Figures are rendered in a separate process pool while the
+next task computes; this process never imports matplotlib.
+
+It is also the headless entry point for batch pipelines: task parameters
+can be given as options, results written as JSON or CSV, and --no-plot
+never imports matplotlib.
+
+Usage (from tasks1/):
+    python -m run_tasks                                  # all tasks, text report + plots
+    python -m run_tasks a c e                            # a subset
+    python -m run_tasks c --a 30 --b 70 --pA-values 0.45 0.5 --num-simulations 5000 \
+        --no-plot --format json --output c.json
+    python -m run_tasks b --a-values 10 50 90 --no-plot --format csv
+    python -m run_tasks --store results/    # keep games on disk; re-runs only simulate what is missing
+"""
+
+import argparse
+import csv
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any
+from simulation_cache import SimulationCache
+from result_store import ResultStore
+
+TASKS = ['a', 'b', 'c', 'd', 'e', 'f']
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(script_dir)
+DEFAULT_PLOT_DIR = os.path.join(repo_root, 'plots', 'tasks1')
+
+
+def load_task(name: str):
+    """Import task_<name> (its matplotlib import is deferred to plot())."""
+    if name not in TASKS:
+        raise ValueError(f"Unknown task {name!r}; expected one of {TASKS}")
+    return importlib.import_module(f'task_{name}')
+
+
+# Task parameters settable from the command line: option -> (type, is a list)
+PARAMETERS = {
+    'a': (int, False),
+    'b': (int, False),
+    'pA': (float, False),
+    'pA_values': (float, True),
+    'a_values': (int, True),
+    'N_values': (int, True),
+    'total_capital': (int, False),
+    'num_simulations': (int, False),
+    'num_games': (int, False),
+    'band_games': (int, False),
+    'band_rounds': (int, False),
+    'ci_half_width': (float, False),
+}
+
+
+def task_parameters(name: str) -> List[str]:
+    """Names of the parameters accepted by compute() of task_<name>."""
+    return [parameter for parameter in inspect.signature(load_task(name).compute).parameters
+            if parameter != 'cache']
+
+
+def run_tasks(names: Optional[List[str]] = None, plot: bool = True, render_workers: Optional[int] = None,
+              seed: int = 0, plot_dir: str = DEFAULT_PLOT_DIR, cache: Optional[SimulationCache] = None,
+              quiet: bool = False, parameters: Optional[Dict[str, Any]] = None) -> Dict:
+    """
+    Compute and report the given tasks (default: all) in order.
+    
+    parameters are passed on to compute() of every task that accepts them
+    (e.g. {'a': 30, 'b': 70}); the others keep their defaults.
+
+    Returns:
+    --------
+    Dict with keys:
+        - results: task name -> result dict of its compute()
+        - plots: task name -> path of the rendered figure (empty without plot)
+        - cache: SimulationCache.report() (games requested vs simulated)
+        - elapsed_s: Wall time of the whole run
+    """
+    start = time.perf_counter()
+    names = names or TASKS
+    modules = {name: load_task(name) for name in names}
+    cache = SimulationCache(seed) if cache is None else cache
+
+    parameters = parameters or {}
+    results = {}
+    pending = {}
+    plots = {}
+    pool = ProcessPoolExecutor(max_workers=render_workers) if plot else None
+    try:
+        for name, module in modules.items():
+            accepted = task_parameters(name)
+            results[name] = module.compute(cache, **{key: value for key, value in parameters.items()
+                                                     if key in accepted})
+            if not quiet:
+                module.report(results[name])
+            if pool is not None:
+                plot_path = os.path.join(plot_dir, module.PLOT_FILE)
+                pending[name] = (plot_path, pool.submit(module.plot, results[name], plot_path))
+
+        for name, (plot_path, future) in pending.items():
+            future.result()
+            plots[name] = plot_path
+            if not quiet:
+                print(f"Task {name.upper()} plots saved to '{plot_path}'")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {
+        'results': results,
+        'plots': plots,
+        'cache': cache.report(),
+        'elapsed_s': time.perf_counter() - start
+    }
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert task results (NumPy arrays and scalars, nested dicts) to plain JSON types."""
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def result_rows(name: str, results: Dict) -> List[Dict]:
+    """
+    Flatten the results of a task into CSV rows: one per entry of
+    results['rows'], with the task's scalar settings repeated on every row.
+    Nested dicts become dotted columns; arrays and lists are left out.
+    """
+    settings = {key: value for key, value in results.items() if key != 'rows' and np.isscalar(value)}
+    rows = []
+    for row in results['rows']:
+        flat = {'task': name, **settings}
+        for key, value in row.items():
+            if isinstance(value, dict):
+                flat.update({f"{key}.{inner}": item for inner, item in value.items() if np.isscalar(item)})
+            elif value is None or np.isscalar(value):
+                flat[key] = value
+        rows.append(to_jsonable(flat))
+    return rows
+
+
+def write_results(run: Dict, output_format: str, stream) -> None:
+    """Write the results of run_tasks as 'json' or 'csv' to an open text stream."""
+    if output_format == 'json':
+        json.dump(to_jsonable({
+            'results': run['results'],
+            'plots': run['plots'],
+            'cache': run['cache'],
+            'elapsed_s': run['elapsed_s']
+        }), stream, indent=2)
+        stream.write('\n')
+        return
+
+    rows = [row for name, results in run['results'].items() for row in result_rows(name, results)]
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    writer = csv.DictWriter(stream, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Gambler's Ruin tasks with shared simulations.")
+    parser.add_argument('tasks', nargs='*', metavar='task',
+                        help=f"tasks to run, any of {' '.join(TASKS)} (default: all)")
+    parser.add_argument('--format', choices=['text', 'json', 'csv'], default='text',
+                        help="text prints the task reports; json/csv write machine-readable results")
+    parser.add_argument('--output', help="file for json/csv results (default: stdout)")
+    parser.add_argument('--no-plot', action='store_true', help="skip the figures (matplotlib is never imported)")
+    parser.add_argument('--plot-dir', default=DEFAULT_PLOT_DIR, help="directory for the figures")
+    parser.add_argument('--render-workers', type=int, default=None,
+                        help="processes rendering the figures (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=0, help="root seed of the shared simulation cache")
+    parser.add_argument('--store', help="directory of a ResultStore keeping the simulated games across runs")
+    parameters = parser.add_argument_group('task parameters (passed to every selected task that uses them)')
+    for name, (kind, is_list) in PARAMETERS.items():
+        parameters.add_argument(f"--{name.replace('_', '-')}", dest=name, type=kind,
+                                nargs='+' if is_list else None, metavar=name.upper() if is_list else None)
+    args = parser.parse_args(argv)
+
+    names = args.tasks or TASKS
+    unknown = [name for name in names if name not in TASKS]
+    if unknown:
+        parser.error(f"unknown task(s) {' '.join(unknown)}; expected any of {' '.join(TASKS)}")
+    given = {name: getattr(args, name) for name in PARAMETERS if getattr(args, name) is not None}
+    accepted = {parameter for name in names for parameter in task_parameters(name)}
+    unused = [name for name in given if name not in accepted]
+    if unused:
+        parser.error(f"--{' --'.join(name.replace('_', '-') for name in unused)} "
+                     f"not used by task(s) {' '.join(names)}")
+
+    machine_readable = args.format != 'text'
+    cache = SimulationCache(args.seed, store=ResultStore(args.store) if args.store else None)
+    run = run_tasks(names, plot=not args.no_plot, render_workers=args.render_workers, seed=args.seed,
+                    plot_dir=args.plot_dir, cache=cache, quiet=machine_readable, parameters=given)
+
+    if machine_readable:
+        if args.output:
+            with open(args.output, 'w', newline='') as f:
+                write_results(run, args.format, f)
+        else:
+            write_results(run, args.format, sys.stdout)
+        return 0
+
+    cache = run['cache']
+    print(f"\nSimulated {cache['games_simulated']} games for {cache['games_requested']} requested "
+          f"({cache['keys']} parameter points) in {run['elapsed_s']:.1f} s")
+    if args.store:
+        print(f"Loaded {cache['games_loaded']} games from '{args.store}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
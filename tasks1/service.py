@@ -0,0 +1,261 @@
+"""
+Gambler's Ruin Problem - Local Query Service
+Small asyncio HTTP/JSON server answering ruin probabilities and durations
+for ad-hoc (a, b, pA), so tools need not shell out to the task scripts
+
+Endpoints (GET, parameters in the query string):
+    /theory?a=50&b=50&pA=0.45              closed forms (LRU-cached)
+    /simulate?a=50&b=50&pA=0.45&n=10000    Monte Carlo, with optional timeout=<seconds>
+    /stats                                 service counters
+    /health
+
+Identical simulations in flight are computed once and shared; simulations
+arriving within --batch-window-ms are run together as simulate_sweep calls
+(one vectorized batch over all their games). Every request has a time
+budget (timeout, default 10 s): simulations whose expected cost
+(n * E[L] rounds) does not fit are refused up front, and a simulation is
+only batched with others if the whole batch fits its remaining budget, so
+cheap requests are not held up by expensive ones. Past the budget the
+client gets 504 while the computation still finishes for anyone else
+waiting on it.
+
+Only the standard library and NumPy are used, and the server binds to
+127.0.0.1 by default. Usage (from tasks1/):
+    python -m service --port 8765
+"""
+
+import sys
+import json
+import math
+import asyncio
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+from gambler_ruin import (theoretical_P_ruin_A, theoretical_expected_rounds, theoretical_variance_rounds,
+                          simulate_sweep)
+
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 10.0
+MAX_TIMEOUT = 60.0
+MAX_GAMES = 10**6
+MAX_CAPITAL = 10**6
+# Conservative throughput of the batched simulator, for admission control
+ROUNDS_PER_SECOND = 2e7
+
+
+class BadRequest(ValueError):
+    """Invalid query parameters (answered with 400)."""
+
+
+class OverBudget(Exception):
+    """Work that cannot finish within the request's time budget (answered with 504)."""
+
+
+@functools.lru_cache(maxsize=4096)
+def theory(a: int, b: int, pA: float) -> Tuple[float, float, float]:
+    """(P_ruin_A, expected_rounds, variance_rounds), cached per (a, b, pA)."""
+    return (float(theoretical_P_ruin_A(a, b, pA)), float(theoretical_expected_rounds(a, b, pA)),
+            float(theoretical_variance_rounds(a, b, pA)))
+
+
+def _parameter(query: Dict[str, List[str]], name: str, kind, default=None):
+    if name not in query:
+        if default is None:
+            raise BadRequest(f"missing parameter {name!r}")
+        return default
+    try:
+        return kind(query[name][-1])
+    except ValueError:
+        raise BadRequest(f"parameter {name!r} must be {kind.__name__}, got {query[name][-1]!r}")
+
+
+def _game(query: Dict[str, List[str]]) -> Tuple[int, int, float]:
+    a = _parameter(query, 'a', int)
+    b = _parameter(query, 'b', int)
+    pA = _parameter(query, 'pA', float)
+    if not (0 < a <= MAX_CAPITAL and 0 < b <= MAX_CAPITAL):
+        raise BadRequest(f"a and b must be in 1..{MAX_CAPITAL}")
+    if not 0 <= pA <= 1:
+        raise BadRequest("pA must be in [0, 1]")
+    return a, b, pA
+
+
+class RuinService:
+    """
+    Request handling: closed forms from the LRU cache, simulations coalesced
+    and micro-batched onto one worker thread (so the event loop stays free).
+    """
+
+    def __init__(self, batch_window: float = 0.005, max_rounds: int = 100000):
+        self.batch_window = batch_window
+        self.max_rounds = max_rounds
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        # Pending simulation -> (estimated seconds, deadline on the loop clock)
+        self._pending: Dict[Tuple, Tuple[float, float]] = {}
+        self._flush_scheduled = False
+        self.counters = dict.fromkeys(('requests', 'errors', 'timeouts', 'simulations', 'coalesced',
+                                       'batches', 'games'), 0)
+
+    async def simulate(self, a: int, b: int, pA: float, n: int, cost: float = 0.0,
+                       budget: float = DEFAULT_TIMEOUT) -> Dict:
+        """
+        Simulation result for (a, b, pA, n), shared with identical requests in
+        flight. cost is its estimated run time and budget the time left for it
+        (seconds), which decide what it may be batched with.
+        """
+        key = (a, b, pA, n)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+        self.counters['simulations'] += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.counters['coalesced'] += 1
+            if key in self._pending:
+                self._pending[key] = (cost, min(self._pending[key][1], deadline))
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._pending[key] = (cost, deadline)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_later(self.batch_window, lambda: asyncio.ensure_future(self._flush()))
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _batches(pending: Dict[Tuple, Tuple[float, float]], now: float) -> List[List[Tuple]]:
+        """
+        Split pending simulations into batches, cheapest first, so that the
+        estimated cost of each batch (and of the batches before it) fits the
+        remaining budget of every simulation in it. A simulation that fits
+        nowhere still runs, alone.
+        """
+        batches, batch, elapsed, batch_cost, batch_slack = [], [], 0.0, 0.0, math.inf
+        for key, (cost, deadline) in sorted(pending.items(), key=lambda item: item[1][0]):
+            slack = deadline - now
+            if batch and elapsed + batch_cost + cost > min(batch_slack, slack):
+                batches.append(batch)
+                elapsed += batch_cost
+                batch, batch_cost, batch_slack = [], 0.0, math.inf
+            batch.append(key)
+            batch_cost += cost
+            batch_slack = min(batch_slack, slack)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _flush(self) -> None:
+        """Run the pending simulations as cost-grouped simulate_sweep batches, cheapest first."""
+        pending, self._pending, self._flush_scheduled = self._pending, {}, False
+        for keys in self._batches(pending, asyncio.get_running_loop().time()):
+            await self._run_batch(keys)
+
+    async def _run_batch(self, keys: List[Tuple]) -> None:
+        """Run keys as one simulate_sweep and resolve their futures."""
+        a, b, pA, n = (list(column) for column in zip(*keys))
+        self.counters['batches'] += 1
+        self.counters['games'] += sum(n)
+        try:
+            rows = await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(simulate_sweep, a, b, pA, n, self.max_rounds))
+        except Exception as error:
+            for key in keys:
+                self._in_flight.pop(key).set_exception(error)
+            return
+        for key, row in zip(keys, rows):
+            self._in_flight.pop(key).set_result({'batch_size': len(keys), **row})
+
+    async def answer(self, path: str, query: Dict[str, List[str]], timeout: float) -> Dict:
+        if path == '/health':
+            return {'status': 'ok'}
+        if path == '/stats':
+            cache = theory.cache_info()
+            return {**self.counters, 'theory_cache': {'hits': cache.hits, 'misses': cache.misses,
+                                                      'size': cache.currsize}}
+        if path == '/theory':
+            a, b, pA = _game(query)
+            P_ruin_A, expected_rounds, variance_rounds = theory(a, b, pA)
+            return {'a': a, 'b': b, 'pA': pA, 'P_ruin_A': P_ruin_A, 'expected_rounds': expected_rounds,
+                    'variance_rounds': variance_rounds}
+        if path == '/simulate':
+            a, b, pA = _game(query)
+            n = _parameter(query, 'n', int, 10000)
+            if not 0 < n <= MAX_GAMES:
+                raise BadRequest(f"n must be in 1..{MAX_GAMES}")
+            expected_seconds = n * min(theory(a, b, pA)[1], self.max_rounds) / ROUNDS_PER_SECOND
+            if expected_seconds > timeout:
+                raise OverBudget(f"about {expected_seconds:.1f} s of simulation needed, time budget is {timeout} s")
+            return await self.simulate(a, b, pA, n, expected_seconds, timeout)
+        raise LookupError(path)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one HTTP/1.1 request per connection."""
+        self.counters['requests'] += 1
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request_line) != 3 or request_line[0] != 'GET':
+                status, body = 405, {'error': 'only GET is supported'}
+            else:
+                url = urlsplit(request_line[1])
+                query = parse_qs(url.query)
+                try:
+                    timeout = min(_parameter(query, 'timeout', float, DEFAULT_TIMEOUT), MAX_TIMEOUT)
+                    status, body = 200, await asyncio.wait_for(self.answer(url.path, query, timeout), timeout)
+                except BadRequest as error:
+                    status, body = 400, {'error': str(error)}
+                except LookupError:
+                    status, body = 404, {'error': f"unknown endpoint {url.path!r}"}
+                except OverBudget as error:
+                    self.counters['timeouts'] += 1
+                    status, body = 504, {'error': str(error)}
+                except asyncio.TimeoutError:
+                    self.counters['timeouts'] += 1
+                    status, body = 504, {'error': f"time budget of {timeout} s exceeded"}
+                except Exception as error:
+                    status, body = 500, {'error': f"{type(error).__name__}: {error}"}
+            if status != 200:
+                self.counters['errors'] += 1
+
+            payload = json.dumps(body).encode()
+            writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                         f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = DEFAULT_PORT, batch_window: float = 0.005,
+                ready: Optional[asyncio.Event] = None) -> None:
+    service = RuinService(batch_window)
+    server = await asyncio.start_server(service.handle, host, port, backlog=1024)
+    print(f"Serving on http://{host}:{port} (batch window {batch_window * 1000:g} ms)", flush=True)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON service for Gambler's Ruin queries.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--batch-window-ms', type=float, default=5.0,
+                        help="how long simulations wait to be batched with later ones")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
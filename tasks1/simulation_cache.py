@@ -0,0 +1,158 @@
+"""
+Gambler's Ruin Problem - Shared Simulation Cache
+Serves the games of every (a, b, pA) from one reproducible stream, so tasks
+asking for overlapping games simulate each game only once
+"""
+
+import numpy as np
+from typing import Tuple, Dict, Callable, Optional
+from gambler_ruin import DurationStats, Distribution, get_backend, simulate_until_precision
+from result_store import ResultStore, code_version
+
+
+class SimulationCache:
+    """
+    In-memory cache of simulated games, keyed by (a, b, pA).
+
+    The games of a key form a fixed sequence generated in blocks of
+    block_size games; block j is seeded from (seed, a, b, pA, max_rounds, j).
+    games(a, b, pA, n) returns the first n games of that sequence, simulating
+    only the blocks not cached yet. The games served therefore do not depend
+    on which tasks asked before, or in what order: task E's 1000 games at
+    a = b = 50, pA = 0.5 are the first 1000 of task C's 10000.
+
+    With a ResultStore the games also persist across runs: a key is first
+    loaded from the store, only the blocks beyond the stored ones are
+    simulated (each from its own block seed, so independent of the stored
+    games) and the extended sequence is written back. Results are identical
+    with or without the store.
+    """
+
+    def __init__(self, seed: int = 0, max_rounds: int = 100000, block_size: int = 2000,
+                 backend: Optional[str] = None, store: Optional[ResultStore] = None):
+        self.seed = seed
+        self.max_rounds = max_rounds
+        self.block_size = block_size
+        self.backend = backend
+        self.store = store
+        self._final_capital: Dict[Tuple, np.ndarray] = {}
+        self._num_rounds: Dict[Tuple, np.ndarray] = {}
+        self.games_requested = 0
+        self.games_simulated = 0
+        self.games_loaded = 0
+
+    def _block_seed(self, a: int, b: int, pA: float, block: int) -> np.random.SeedSequence:
+        pA_bits = int(np.float64(pA).view(np.uint64))
+        return np.random.SeedSequence([self.seed, a, b, pA_bits, self.max_rounds, block])
+
+    def _store_key(self, a: int, b: int, pA: float) -> Dict:
+        """Everything the games of (a, b, pA) depend on, as a ResultStore key."""
+        return {
+            'function': 'games',
+            'a': int(a),
+            'b': int(b),
+            'pA': float(pA),
+            'N': None,
+            'max_rounds': self.max_rounds,
+            'seed': self.seed,
+            'block_size': self.block_size,
+            'backend': get_backend(self.backend).name,
+            'code_version': code_version()
+        }
+
+    def _load(self, key: Tuple) -> None:
+        """Take the stored games of key, if any, as its cached games."""
+        stored = self.store.load(self._store_key(*key))
+        if stored is None:
+            return
+        self._final_capital[key] = stored['final_capital']
+        self._num_rounds[key] = stored['num_rounds']
+        self.games_loaded += stored['final_capital'].size
+
+    def _extend(self, a: int, b: int, pA: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Make sure at least n games of (a, b, pA) are cached and return all cached games."""
+        key = (a, b, float(pA))
+        if self.store is not None and key not in self._final_capital:
+            self._load(key)
+        final_capital = self._final_capital.get(key, np.zeros(0, dtype=np.int64))
+        num_rounds = self._num_rounds.get(key, np.zeros(0, dtype=np.int64))
+
+        if final_capital.size < n:
+            batch = get_backend(self.backend).batch
+            first_block = final_capital.size // self.block_size
+            blocks = [batch(a, b, pA, self.block_size, self.max_rounds,
+                            np.random.default_rng(self._block_seed(a, b, pA, j)))
+                      for j in range(first_block, -(-n // self.block_size))]
+            final_capital = np.concatenate([final_capital] + [block[0] for block in blocks])
+            num_rounds = np.concatenate([num_rounds] + [block[1] for block in blocks])
+            final_capital.flags.writeable = False
+            num_rounds.flags.writeable = False
+            self._final_capital[key] = final_capital
+            self._num_rounds[key] = num_rounds
+            self.games_simulated += len(blocks) * self.block_size
+            if self.store is not None:
+                self.store.save(self._store_key(*key), final_capital, num_rounds)
+
+        return final_capital, num_rounds
+
+    def games(self, a: int, b: int, pA: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The first n games of (a, b, pA).
+
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray]
+            (final_capital, num_rounds) as read-only arrays of length n
+        """
+        final_capital, num_rounds = self._extend(a, b, pA, n)
+        self.games_requested += n
+        return final_capital[:n], num_rounds[:n]
+
+    def multiple_games(self, a: int, b: int, pA: float, num_simulations: int,
+                       distribution: bool = False) -> Dict:
+        """Cached counterpart of simulate_multiple_games (same result keys)."""
+        final_capital, num_rounds = self.games(a, b, pA, num_simulations)
+        A_wins = final_capital > 0
+        results = {
+            'P_ruin_A': 1 - np.mean(A_wins),
+            'avg_rounds': np.mean(num_rounds),
+            'truncated': int((A_wins & (final_capital < a + b)).sum())
+        }
+        if distribution:
+            results['duration'] = Distribution.from_values(num_rounds)
+        else:
+            results.update(A_wins=A_wins.tolist(), num_rounds=num_rounds.tolist())
+        return results
+
+    def sampler(self, a: int, b: int, pA: float) -> Callable[[int], DurationStats]:
+        """
+        A sample(n) callable for simulate_until_precision that serves
+        consecutive cached games, starting from the first.
+        """
+        position = 0
+
+        def sample(n: int) -> DurationStats:
+            nonlocal position
+            final_capital, num_rounds = self._extend(a, b, pA, position + n)
+            final_capital = final_capital[position:position + n]
+            num_rounds = num_rounds[position:position + n]
+            position += n
+            self.games_requested += n
+            stats = DurationStats(self.max_rounds)
+            stats.update(num_rounds, final_capital <= 0, (final_capital > 0) & (final_capital < a + b))
+            return stats
+
+        return sample
+
+    def until_precision(self, a: int, b: int, pA: float, **kwargs) -> Dict:
+        """simulate_until_precision drawing its games from the cache."""
+        return simulate_until_precision(a, b, pA, max_rounds=self.max_rounds, sample=self.sampler(a, b, pA), **kwargs)
+
+    def report(self) -> Dict:
+        """Games requested by the tasks versus games actually simulated (and loaded from the store)."""
+        return {
+            'keys': len(self._final_capital),
+            'games_requested': self.games_requested,
+            'games_simulated': self.games_simulated,
+            'games_loaded': self.games_loaded
+        }
@@ -11,9 +11,10 @@ Find:
 - Comparison of the simulation result with the analytical (theoretical) result.
 """
 
-import matplotlib.pyplot as plt
 import os
-from gambler_ruin import simulate_multiple_games, theoretical_P_ruin_A
+from typing import Dict, List
+from gambler_ruin import simulate_ruin_importance_sampling, theoretical_P_ruin_A, phase
+from simulation_cache import SimulationCache
 
 # Given parameters
 a = 50
@@ -24,81 +25,129 @@ b = 50
 # Typically, we'd want to test pA < 0.5, pA = 0.5, and pA > 0.5
 
 pA_values = [0.3, 0.4, 0.5, 0.6, 0.7]
-num_simulations = 10000
-
-print("=" * 70)
-print("Task A – Gambler's Ruin")
-print("=" * 70)
-print(f"Given: a = {a}, b = {b}")
-print(f"Number of simulations: {num_simulations}")
-print()
-
-# Store results for plotting
-sim_results = []
-theory_results = []
-errors = []
-relative_errors = []
-
-for pA in pA_values:
-    print(f"\nFor pA = {pA}:")
-    print("-" * 70)
-    
-    # Simulation
-    results = simulate_multiple_games(a, b, pA, num_simulations)
-    P_ruin_A_sim = results['P_ruin_A']
-    
-    # Theoretical
-    P_ruin_A_theory = theoretical_P_ruin_A(a, b, pA)
-    
-    # Comparison
-    error = abs(P_ruin_A_sim - P_ruin_A_theory)
-    relative_error = (error / P_ruin_A_theory * 100) if P_ruin_A_theory > 0 else 0
-    
-    # Store for plotting
-    sim_results.append(P_ruin_A_sim)
-    theory_results.append(P_ruin_A_theory)
-    errors.append(error)
-    relative_errors.append(relative_error)
-    
-    print(f"  Simulation P(ruin of A) = {P_ruin_A_sim:.6f}")
-    print(f"  Theoretical P(ruin of A) = {P_ruin_A_theory:.6f}")
-    print(f"  Absolute error = {error:.6f}")
-    print(f"  Relative error = {relative_error:.2f}%")
-    print(f"  Average number of rounds = {results['avg_rounds']:.2f}")
-
-# Create plots
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-fig.suptitle(f'Task A: P(ruin of A) vs pA (a = {a}, b = {b})', fontsize=14)
-
-# Plot 1: Simulation vs Theoretical
-ax1 = axes[0]
-ax1.plot(pA_values, sim_results, 'o-', linewidth=2, markersize=8, label='Simulation', color='blue')
-ax1.plot(pA_values, theory_results, 's--', linewidth=2, markersize=8, label='Theoretical', color='red')
-ax1.set_xlabel('pA (Probability A wins)', fontsize=11)
-ax1.set_ylabel('P(ruin of A)', fontsize=11)
-ax1.set_title('Simulation vs Theoretical', fontsize=12)
-ax1.legend()
-ax1.grid(True, alpha=0.3)
-
-# Plot 2: Error
-ax2 = axes[1]
-ax2.plot(pA_values, errors, 'o-', linewidth=2, markersize=8, color='green')
-ax2.set_xlabel('pA (Probability A wins)', fontsize=11)
-ax2.set_ylabel('Absolute Error', fontsize=11)
-ax2.set_title('Simulation Error', fontsize=12)
-ax2.grid(True, alpha=0.3)
-
-plt.tight_layout()
-# Save to plots/tasks1/ directory (relative to repo root)
-script_dir = os.path.dirname(os.path.abspath(__file__))
-repo_root = os.path.dirname(script_dir)
-plot_path = os.path.join(repo_root, 'plots', 'tasks1', 'task_a_comparison.png')
-os.makedirs(os.path.dirname(plot_path), exist_ok=True)
-plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-print(f"\nPlots saved to '{plot_path}'")
-
-print("\n" + "=" * 70)
-print("Note: For a = b = 50, when pA = 0.5, the game is fair and")
-print("P(ruin of A) = b/(a+b) = 0.5 (theoretical)")
-print("=" * 70)
+ci_half_width = 0.01  # Simulate until the 95% CI of P(ruin of A) is this narrow
 
+PLOT_FILE = 'task_a_comparison.png'
+
+
+def compute(cache: SimulationCache, a: int = a, b: int = b, pA_values: List[float] = pA_values,
+            ci_half_width: float = ci_half_width) -> Dict:
+    """Simulate every pA (games shared through the cache) and compare with theory."""
+    rows = []
+    for pA in pA_values:
+        # Simulation
+        with phase('simulation'):
+            results = cache.until_precision(a, b, pA, abs_tol=ci_half_width)
+            P_ruin_A_sim = results['P_ruin_A']
+
+            # Ruin of A is too rare for plain Monte Carlo when A is favoured:
+            # estimate it by importance sampling under the swapped drift instead
+            results_is = None
+            if pA > 0.5:
+                results_is = simulate_ruin_importance_sampling(a, b, pA, num_simulations=10000, seed=cache.seed)
+                P_ruin_A_sim = results_is['P_ruin_A']
+
+        # Theoretical
+        P_ruin_A_theory = theoretical_P_ruin_A(a, b, pA)
+
+        # Comparison
+        error = abs(P_ruin_A_sim - P_ruin_A_theory)
+        relative_error = (error / P_ruin_A_theory * 100) if P_ruin_A_theory > 0 else 0
+
+        rows.append({
+            'pA': pA,
+            'P_ruin_A_sim': P_ruin_A_sim,
+            'P_ruin_A_theory': P_ruin_A_theory,
+            'error': error,
+            'relative_error': relative_error,
+            'ci_low': results['ci_low'],
+            'ci_high': results['ci_high'],
+            'num_games': results['num_games'],
+            'avg_rounds': results['avg_rounds'],
+            'importance_sampling': None if results_is is None else {
+                'std_error': results_is['std_error'],
+                'ess': results_is['ess']
+            }
+        })
+    return {'a': a, 'b': b, 'ci_half_width': ci_half_width, 'rows': rows}
+
+
+def report(results: Dict) -> None:
+    print("=" * 70)
+    print("Task A – Gambler's Ruin")
+    print("=" * 70)
+    print(f"Given: a = {results['a']}, b = {results['b']}")
+    print(f"Target 95% CI half-width: {results['ci_half_width']}")
+    print()
+
+    for row in results['rows']:
+        print(f"\nFor pA = {row['pA']}:")
+        print("-" * 70)
+        if row['importance_sampling'] is not None:
+            print(f"  Simulation P(ruin of A) = {row['P_ruin_A_sim']:.6e} (importance sampling)")
+            print(f"  Standard error = {row['importance_sampling']['std_error']:.3e}, "
+                  f"ESS = {row['importance_sampling']['ess']:.0f}")
+            print(f"  Theoretical P(ruin of A) = {row['P_ruin_A_theory']:.6e}")
+        else:
+            print(f"  Simulation P(ruin of A) = {row['P_ruin_A_sim']:.6f}")
+            print(f"  95% CI = [{row['ci_low']:.6f}, {row['ci_high']:.6f}] ({row['num_games']} games)")
+            print(f"  Theoretical P(ruin of A) = {row['P_ruin_A_theory']:.6f}")
+        print(f"  Absolute error = {row['error']:.6f}")
+        print(f"  Relative error = {row['relative_error']:.2f}%")
+        print(f"  Average number of rounds = {row['avg_rounds']:.2f}")
+
+    print("\n" + "=" * 70)
+    print("Note: For a = b = 50, when pA = 0.5, the game is fair and")
+    print("P(ruin of A) = b/(a+b) = 0.5 (theoretical)")
+    print("=" * 70)
+
+
+def plot(results: Dict, plot_path: str) -> None:
+    """Render the comparison figure to plot_path (matplotlib is imported here, with the Agg backend)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    pA_vals = [row['pA'] for row in results['rows']]
+    sim_results = [row['P_ruin_A_sim'] for row in results['rows']]
+    theory_results = [row['P_ruin_A_theory'] for row in results['rows']]
+    errors = [row['error'] for row in results['rows']]
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    fig.suptitle(f"Task A: P(ruin of A) vs pA (a = {results['a']}, b = {results['b']})", fontsize=14)
+
+    # Plot 1: Simulation vs Theoretical
+    ax1 = axes[0]
+    ax1.plot(pA_vals, sim_results, 'o-', linewidth=2, markersize=8, label='Simulation', color='blue')
+    ax1.plot(pA_vals, theory_results, 's--', linewidth=2, markersize=8, label='Theoretical', color='red')
+    ax1.set_xlabel('pA (Probability A wins)', fontsize=11)
+    ax1.set_ylabel('P(ruin of A)', fontsize=11)
+    ax1.set_title('Simulation vs Theoretical', fontsize=12)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # Plot 2: Error
+    ax2 = axes[1]
+    ax2.plot(pA_vals, errors, 'o-', linewidth=2, markersize=8, color='green')
+    ax2.set_xlabel('pA (Probability A wins)', fontsize=11)
+    ax2.set_ylabel('Absolute Error', fontsize=11)
+    ax2.set_title('Simulation Error', fontsize=12)
+    ax2.grid(True, alpha=0.3)
+
+    os.makedirs(os.path.dirname(plot_path), exist_ok=True)
+    with phase('rendering'):
+        plt.tight_layout()
+        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    results = compute(SimulationCache())
+    report(results)
+
+    # Save to plots/tasks1/ directory (relative to repo root)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    repo_root = os.path.dirname(script_dir)
+    plot_path = os.path.join(repo_root, 'plots', 'tasks1', PLOT_FILE)
+    plot(results, plot_path)
+    print(f"\nPlots saved to '{plot_path}'")
@@ -13,10 +13,10 @@ For each value of pA, find:
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 import os
-from collections import Counter
-from gambler_ruin import simulate_multiple_games, theoretical_expected_rounds
+from typing import Dict, List
+from gambler_ruin import theoretical_expected_rounds, theoretical_duration_distribution, phase
+from simulation_cache import SimulationCache
 
 # Given parameters
 a = 50
@@ -24,80 +24,122 @@ b = 50
 pA_values = [1/5, 1/2, 4/5]  # [0.2, 0.5, 0.8]
 num_simulations = 10000
 
-print("=" * 70)
-print("Task C – Number of Rounds (L) Until the Game Ends")
-print("=" * 70)
-print(f"Given: a = {a}, b = {b}")
-print(f"Number of simulations: {num_simulations}")
-print()
-
-# Create figure for distributions
-fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-fig.suptitle('Distribution of Game Duration L for Different pA Values', fontsize=14)
-
-for idx, pA in enumerate(pA_values):
-    print(f"\nFor pA = {pA} ({pA:.1f}):")
-    print("-" * 70)
-    
-    # Simulation
-    results = simulate_multiple_games(a, b, pA, num_simulations)
-    num_rounds_list = results['num_rounds']
-    
-    # Distribution P(L)
-    rounds_counter = Counter(num_rounds_list)
-    total = len(num_rounds_list)
-    max_rounds = max(num_rounds_list)
-    
-    # Create distribution
-    L_values = sorted(rounds_counter.keys())
-    P_L = [rounds_counter[L] / total for L in L_values]
-    
-    # Statistics
-    avg_rounds_sim = results['avg_rounds']
-    median_rounds = np.median(num_rounds_list)
-    std_rounds = np.std(num_rounds_list)
-    
-    # Theoretical expected value (approximation)
-    # Note: Exact theoretical formula for distribution is complex
-    # We'll compute expected value
-    try:
-        avg_rounds_theory = theoretical_expected_rounds(a, b, pA)
-    except:
-        avg_rounds_theory = None
-    
-    print(f"  Average duration (simulation) = {avg_rounds_sim:.2f} rounds")
-    if avg_rounds_theory is not None:
-        print(f"  Average duration (theoretical) = {avg_rounds_theory:.2f} rounds")
-    print(f"  Median duration = {median_rounds:.2f} rounds")
-    print(f"  Standard deviation = {std_rounds:.2f} rounds")
-    print(f"  Minimum rounds = {min(num_rounds_list)}")
-    print(f"  Maximum rounds = {max(num_rounds_list)}")
-    
-    # Plot distribution
-    ax = axes[idx]
-    # Use histogram for better visualization
-    ax.hist(num_rounds_list, bins=min(100, max_rounds//10 + 1), density=True, alpha=0.7, edgecolor='black')
-    ax.axvline(avg_rounds_sim, color='r', linestyle='--', linewidth=2, label=f'Mean = {avg_rounds_sim:.1f}')
-    if avg_rounds_theory is not None:
-        ax.axvline(avg_rounds_theory, color='g', linestyle='--', linewidth=2, label=f'Theory = {avg_rounds_theory:.1f}')
-    ax.set_xlabel('Number of Rounds (L)', fontsize=10)
-    ax.set_ylabel('Probability Density P(L)', fontsize=10)
-    ax.set_title(f'pA = {pA:.1f}', fontsize=12)
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-    
-    # Print some distribution statistics
-    print(f"  Distribution range: L ∈ [{min(L_values)}, {max(L_values)}]")
-    print(f"  Most common L value: {rounds_counter.most_common(1)[0][0]} (occurred {rounds_counter.most_common(1)[0][1]} times)")
-
-plt.tight_layout()
-# Save to plots/tasks1/ directory (relative to repo root)
-script_dir = os.path.dirname(os.path.abspath(__file__))
-repo_root = os.path.dirname(script_dir)
-plot_path = os.path.join(repo_root, 'plots', 'tasks1', 'task_c_distributions.png')
-os.makedirs(os.path.dirname(plot_path), exist_ok=True)
-plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-print(f"\nDistribution plots saved to '{plot_path}'")
-
-print("\n" + "=" * 70)
+PLOT_FILE = 'task_c_distributions.png'
 
+
+def compute(cache: SimulationCache, a: int = a, b: int = b, pA_values: List[float] = pA_values,
+            num_simulations: int = num_simulations) -> Dict:
+    """Simulate the durations for every pA (games shared through the cache) and the exact P(L)."""
+    rows = []
+    for pA in pA_values:
+        # Simulation
+        with phase('simulation'):
+            results = cache.multiple_games(a, b, pA, num_simulations, distribution=True)
+
+        # Distribution P(L)
+        with phase('distribution'):
+            duration = results['duration']
+            max_rounds = duration.max
+            L_values, L_counts = duration.nonzero()
+            most_common_L, most_common_count = duration.top(1)
+
+        # Exact E[L] and distribution P(L = n) up to the longest simulated game
+        with phase('theory'):
+            avg_rounds_theory = theoretical_expected_rounds(a, b, pA)
+            exact = theoretical_duration_distribution(a, b, pA, max_rounds)
+
+        rows.append({
+            'pA': pA,
+            'L_values': L_values,
+            'L_counts': L_counts,
+            'avg_rounds_sim': results['avg_rounds'],
+            'avg_rounds_theory': avg_rounds_theory,
+            'median_rounds': duration.median,
+            'median_rounds_exact': int(np.searchsorted(exact['cdf'], 0.5)),
+            'std_rounds': duration.std,
+            'min_rounds': duration.min,
+            'max_rounds': max_rounds,
+            'truncated': results['truncated'],
+            'most_common_L': int(most_common_L[0]),
+            'most_common_count': int(most_common_count[0]),
+            'exact_n': exact['n'],
+            'exact_pmf': exact['pmf'],
+            'exact_tail': exact['survival'][-1]
+        })
+    return {'a': a, 'b': b, 'num_simulations': num_simulations, 'rows': rows}
+
+
+def report(results: Dict) -> None:
+    print("=" * 70)
+    print("Task C – Number of Rounds (L) Until the Game Ends")
+    print("=" * 70)
+    print(f"Given: a = {results['a']}, b = {results['b']}")
+    print(f"Number of simulations: {results['num_simulations']}")
+    print()
+
+    for row in results['rows']:
+        print(f"\nFor pA = {row['pA']} ({row['pA']:.1f}):")
+        print("-" * 70)
+        print(f"  Average duration (simulation) = {row['avg_rounds_sim']:.2f} rounds")
+        print(f"  Average duration (theoretical) = {row['avg_rounds_theory']:.2f} rounds")
+        print(f"  Median duration = {row['median_rounds']:.2f} rounds (exact: {row['median_rounds_exact']})")
+        print(f"  Standard deviation = {row['std_rounds']:.2f} rounds")
+        print(f"  Minimum rounds = {row['min_rounds']}")
+        print(f"  Maximum rounds = {row['max_rounds']}")
+        if row['truncated']:
+            print(f"  Games truncated at max_rounds = {row['truncated']} (biases P(ruin of A) down)")
+
+        # Print some distribution statistics
+        print(f"  Distribution range: L ∈ [{row['min_rounds']}, {row['max_rounds']}]")
+        print(f"  Exact P(L > {row['max_rounds']}) = {row['exact_tail']:.3e}")
+        print(f"  Most common L value: {row['most_common_L']} (occurred {row['most_common_count']} times)")
+
+    print("\n" + "=" * 70)
+
+
+def plot(results: Dict, plot_path: str) -> None:
+    """Render the duration histograms to plot_path (matplotlib is imported here, with the Agg backend)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Create figure for distributions
+    num_plots = len(results['rows'])
+    fig, axes = plt.subplots(1, num_plots, figsize=(6 * num_plots, 5), squeeze=False)
+    fig.suptitle('Distribution of Game Duration L for Different pA Values', fontsize=14)
+
+    for idx, row in enumerate(results['rows']):
+        ax = axes[0, idx]
+        # Use histogram for better visualization
+        _, bin_edges, _ = ax.hist(row['L_values'], weights=row['L_counts'], bins=min(100, row['max_rounds']//10 + 1),
+                                  density=True, alpha=0.7, edgecolor='black', label='Simulation')
+        # Exact P(L) aggregated into the same bins as the histogram
+        exact_density = np.histogram(row['exact_n'], bins=bin_edges, weights=row['exact_pmf'])[0] / np.diff(bin_edges)
+        ax.stairs(exact_density, bin_edges, color='black', linewidth=2, label='Exact P(L)')
+        ax.axvline(row['avg_rounds_sim'], color='r', linestyle='--', linewidth=2,
+                   label=f"Mean = {row['avg_rounds_sim']:.1f}")
+        ax.axvline(row['avg_rounds_theory'], color='g', linestyle='--', linewidth=2,
+                   label=f"Theory = {row['avg_rounds_theory']:.1f}")
+        ax.set_xlabel('Number of Rounds (L)', fontsize=10)
+        ax.set_ylabel('Probability Density P(L)', fontsize=10)
+        ax.set_title(f"pA = {row['pA']:.1f}", fontsize=12)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+    os.makedirs(os.path.dirname(plot_path), exist_ok=True)
+    with phase('rendering'):
+        plt.tight_layout()
+        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    results = compute(SimulationCache())
+    report(results)
+
+    # Save to plots/tasks1/ directory (relative to repo root)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    repo_root = os.path.dirname(script_dir)
+    plot_path = os.path.join(repo_root, 'plots', 'tasks1', PLOT_FILE)
+    plot(results, plot_path)
+    print(f"\nDistribution plots saved to '{plot_path}'")
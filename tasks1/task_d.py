@@ -9,62 +9,132 @@ Given:
 For each value of pA, find:
 - The number of wins over time for the selected player
 - Plot trajectories for 3 separate games on one common graph.
+  (Shown over the median and 5-95% band of the cumulative wins per round
+  across many more games.)
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
 import os
-from gambler_ruin import simulate_game_with_wins
+import numpy as np
+from typing import Dict, List
+from gambler_ruin import (simulate_trajectories, trajectory_bands, theoretical_duration_distribution,
+                          decimate_lttb, phase)
+from simulation_cache import SimulationCache
 
 # Given parameters
 a = 10
 b = 20 - a  # a + b = 20
 pA_values = [1/5, 1/2, 4/5]  # [0.2, 0.5, 0.8]
 num_games = 3
+band_games = 2000  # Games behind the quantile bands
+band_rounds = 2000  # Longest band; shorter where 99.9% of games are over sooner
+plot_points = 1000  # Points per plotted trajectory (LTTB decimation)
 
-print("=" * 70)
-print("Task D – Trajectory of the Number of Wins for Player A")
-print("=" * 70)
-print(f"Given: a = {a}, a + b = {a + b} (so b = {b})")
-print(f"Number of games to plot: {num_games}")
-print()
-
-# Create figure with subplots for each pA value
-fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-fig.suptitle('Trajectories of Number of Wins for Player A (3 games per pA)', fontsize=14)
-
-for idx, pA in enumerate(pA_values):
-    print(f"\nFor pA = {pA} ({pA:.1f}):")
-    print("-" * 70)
-    
-    ax = axes[idx]
-    
-    # Simulate 3 games
-    for game_num in range(num_games):
-        A_wins, total_rounds, capital_history, wins_history = simulate_game_with_wins(a, b, pA)
-        
-        # Plot trajectory
-        rounds_list = list(range(len(wins_history)))
-        ax.plot(rounds_list, wins_history, linewidth=2, alpha=0.7, 
-                label=f'Game {game_num + 1} ({total_rounds} rounds, A {"won" if A_wins else "lost"})')
+PLOT_FILE = 'task_d_trajectories.png'
+
+
+def compute(cache: SimulationCache, a: int = a, b: int = b, pA_values: List[float] = pA_values,
+            num_games: int = num_games, band_games: int = band_games, band_rounds: int = band_rounds) -> Dict:
+    """
+    Simulate num_games trajectories per pA and the per-round bands over
+    band_games games. Whole trajectories are not cached, so only the cache
+    seed is used.
+    """
+    rows = []
+    for idx, pA in enumerate(pA_values):
+        with phase('simulation'):
+            trajectories = simulate_trajectories(a, b, pA, num_games, seed=[cache.seed, idx])
+        games = []
+        for game_num in range(num_games):
+            total_rounds = int(trajectories['num_rounds'][game_num])
+            games.append({
+                'A_wins': bool(trajectories['A_wins'][game_num]),
+                'total_rounds': total_rounds,
+                'wins_history': trajectories['wins'][game_num, :total_rounds + 1]
+            })
         
-        final_wins = wins_history[-1] if wins_history else 0
-        print(f"  Game {game_num + 1}: {total_rounds} rounds, A {'won' if A_wins else 'lost'}, Final wins: {final_wins}")
-    
-    ax.set_xlabel('Round Number', fontsize=10)
-    ax.set_ylabel('Cumulative Wins for Player A', fontsize=10)
-    ax.set_title(f'pA = {pA:.1f}', fontsize=12)
-    ax.legend(fontsize=9)
-    ax.grid(True, alpha=0.3)
-
-plt.tight_layout()
-# Save to plots/tasks1/ directory (relative to repo root)
-script_dir = os.path.dirname(os.path.abspath(__file__))
-repo_root = os.path.dirname(script_dir)
-plot_path = os.path.join(repo_root, 'plots', 'tasks1', 'task_d_trajectories.png')
-os.makedirs(os.path.dirname(plot_path), exist_ok=True)
-plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-print(f"\nTrajectory plots saved to '{plot_path}'")
-
-print("\n" + "=" * 70)
+        # Bands up to the round by which 99.9% of games are over
+        with phase('theory'):
+            cdf = theoretical_duration_distribution(a, b, pA, band_rounds)['cdf']
+        horizon = min(int(np.searchsorted(cdf, 0.999)), band_rounds)
+        with phase('simulation'):
+            bands = trajectory_bands(a, b, pA, band_games, horizon, seed=[cache.seed, idx, 1]).bands()
+        rows.append({
+            'pA': pA,
+            'games': games,
+            'band_rounds': bands['rounds'],
+            'wins_q05': bands[0.05],
+            'wins_median': bands[0.5],
+            'wins_q95': bands[0.95]
+        })
+    return {'a': a, 'b': b, 'num_games': num_games, 'band_games': band_games, 'rows': rows}
+
+
+def report(results: Dict) -> None:
+    print("=" * 70)
+    print("Task D – Trajectory of the Number of Wins for Player A")
+    print("=" * 70)
+    print(f"Given: a = {results['a']}, a + b = {results['a'] + results['b']} (so b = {results['b']})")
+    print(f"Number of games to plot: {results['num_games']}")
+    print()
+
+    for row in results['rows']:
+        print(f"\nFor pA = {row['pA']} ({row['pA']:.1f}):")
+        print("-" * 70)
+        for game_num, game in enumerate(row['games']):
+            final_wins = game['wins_history'][-1]
+            print(f"  Game {game_num + 1}: {game['total_rounds']} rounds, A {'won' if game['A_wins'] else 'lost'}, "
+                  f"Final wins: {final_wins}")
+        print(f"  Final wins over {results['band_games']} games: median {row['wins_median'][-1]}, "
+              f"90% band [{row['wins_q05'][-1]}, {row['wins_q95'][-1]}]")
+
+    print("\n" + "=" * 70)
+
+
+def plot(results: Dict, plot_path: str) -> None:
+    """Render the trajectories to plot_path (matplotlib is imported here, with the Agg backend)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Create figure with subplots for each pA value
+    num_plots = len(results['rows'])
+    fig, axes = plt.subplots(1, num_plots, figsize=(6 * num_plots, 5), squeeze=False)
+    fig.suptitle(f"Trajectories of Number of Wins for Player A ({results['num_games']} games per pA, "
+                 f"bands over {results['band_games']})", fontsize=14)
+
+    for idx, row in enumerate(results['rows']):
+        ax = axes[0, idx]
+        ax.fill_between(row['band_rounds'], row['wins_q05'], row['wins_q95'], step='post', color='gray',
+                        alpha=0.25, label='5-95% band')
+        ax.step(row['band_rounds'], row['wins_median'], where='post', color='black', linewidth=1.5,
+                label='Median')
+        for game_num, game in enumerate(row['games']):
+            # Plot trajectory, decimated to at most plot_points points
+            rounds_list, wins_history = decimate_lttb(np.arange(len(game['wins_history'])), game['wins_history'],
+                                                      plot_points)
+            ax.plot(rounds_list, wins_history, linewidth=2, alpha=0.7,
+                    label=f"Game {game_num + 1} ({game['total_rounds']} rounds, A {'won' if game['A_wins'] else 'lost'})")
+
+        ax.set_xlabel('Round Number', fontsize=10)
+        ax.set_ylabel('Cumulative Wins for Player A', fontsize=10)
+        ax.set_title(f"pA = {row['pA']:.1f}", fontsize=12)
+        ax.legend(fontsize=9)
+        ax.grid(True, alpha=0.3)
+
+    os.makedirs(os.path.dirname(plot_path), exist_ok=True)
+    with phase('rendering'):
+        plt.tight_layout()
+        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    results = compute(SimulationCache())
+    report(results)
 
+    # Save to plots/tasks1/ directory (relative to repo root)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    repo_root = os.path.dirname(script_dir)
+    plot_path = os.path.join(repo_root, 'plots', 'tasks1', PLOT_FILE)
+    plot(results, plot_path)
+    print(f"\nTrajectory plots saved to '{plot_path}'")
@@ -0,0 +1,116 @@
+"""
+Gambler's Ruin Problem - Statistical Equivalence of the Simulation Backends
+Every registered backend must reproduce the exact results (moments, P(L),
+P(k)) within sampling error; seeds are fixed, so the tests are deterministic
+
+Usage (from tasks1/):
+    python -m pytest -q test_backends.py
+"""
+
+import numpy as np
+import pytest
+from gambler_ruin import (available_backends, get_backend, theoretical_duration_moments,
+                          theoretical_duration_distribution, theoretical_capital_distribution)
+
+BACKENDS = available_backends()
+GAMES = (5, 5, 0.5), (4, 8, 0.45), (6, 3, 0.7)
+NUM_SIMULATIONS = 4000
+MAX_ROUNDS = 10**6  # Far beyond any game here, so nothing is truncated
+Z_BOUND = 4.5
+
+
+def chi_square(counts: np.ndarray, probabilities: np.ndarray, num_samples: int) -> float:
+    """
+    Standardized chi² of counts against probabilities, after pooling the
+    smallest cells (from the tail) until every cell expects at least 5.
+    Returns (chi² - df) / sqrt(2 df), approximately N(0, 1).
+    """
+    observed, expected = [], []
+    pooled_observed = pooled_expected = 0.0
+    for count, probability in zip(counts, probabilities):
+        pooled_observed += count
+        pooled_expected += num_samples * probability
+        if pooled_expected >= 5:
+            observed.append(pooled_observed)
+            expected.append(pooled_expected)
+            pooled_observed = pooled_expected = 0.0
+    observed[-1] += pooled_observed
+    expected[-1] += pooled_expected
+    observed, expected = np.array(observed), np.array(expected)
+    df = observed.size - 1
+    return float((((observed - expected) ** 2 / expected).sum() - df) / np.sqrt(2 * df))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('game', GAMES)
+def test_batch_moments(backend, game):
+    a, b, pA = game
+    final_capital, num_rounds = get_backend(backend).batch(a, b, pA, NUM_SIMULATIONS, MAX_ROUNDS,
+                                                           np.random.default_rng([1, a, b]))
+    exact = theoretical_duration_moments(a, b, pA)
+    ruined = final_capital <= 0
+    P = exact['P_ruin_A']
+    assert abs(ruined.mean() - P) / np.sqrt(P * (1 - P) / NUM_SIMULATIONS) < Z_BOUND
+    assert abs(num_rounds.mean() - exact['expected_rounds']) / np.sqrt(
+        exact['variance_rounds'] / NUM_SIMULATIONS) < Z_BOUND
+    assert np.all((final_capital == 0) | (final_capital == a + b))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('game', GAMES)
+def test_batch_duration_distribution(backend, game):
+    a, b, pA = game
+    _, num_rounds = get_backend(backend).batch(a, b, pA, NUM_SIMULATIONS, MAX_ROUNDS,
+                                               np.random.default_rng([2, a, b]))
+    exact = theoretical_duration_distribution(a, b, pA, int(num_rounds.max()))
+    counts = np.bincount(num_rounds, minlength=exact['pmf'].size)
+    # The tail beyond the longest simulated game joins the last cell
+    probabilities = exact['pmf'].copy()
+    probabilities[-1] += exact['survival'][-1]
+    assert chi_square(counts, probabilities, NUM_SIMULATIONS) < Z_BOUND
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('game', GAMES)
+def test_capital_distribution(backend, game):
+    a, b, pA = game
+    N = 7
+    final_capital = get_backend(backend).capital_batch(a, b, pA, N, NUM_SIMULATIONS,
+                                                       np.random.default_rng([3, a, b]))
+    exact = theoretical_capital_distribution(a, b, pA, [N])
+    counts = np.bincount(final_capital, minlength=a + b + 1)
+    # Parity: after N rounds only capitals k with k = a + N (mod 2), or a barrier, are reachable
+    reachable = exact['P_k'][0] > 0
+    assert counts[~reachable].sum() == 0
+    assert chi_square(counts[reachable], exact['P_k'][0][reachable], NUM_SIMULATIONS) < Z_BOUND
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_game_steps(backend):
+    a, b, pA = 4, 8, 0.45
+    num_games = 1000
+    rng = np.random.default_rng(4)
+    A_wins = np.empty(num_games, dtype=bool)
+    num_rounds = np.empty(num_games, dtype=np.int64)
+    for i in range(num_games):
+        A_wins[i], num_rounds[i], won = get_backend(backend).game_steps(a, b, pA, MAX_ROUNDS, rng)
+        # The recorded rounds replay the game to the reported end
+        path = a + np.cumsum(np.where(won, 1, -1))
+        assert won.size == num_rounds[i] and path[-1] == (a + b if A_wins[i] else 0)
+        assert np.all((path[:-1] > 0) & (path[:-1] < a + b))
+    exact = theoretical_duration_moments(a, b, pA)
+    P = exact['P_ruin_A']
+    assert abs((~A_wins).mean() - P) / np.sqrt(P * (1 - P) / num_games) < Z_BOUND
+    assert abs(num_rounds.mean() - exact['expected_rounds']) / np.sqrt(
+        exact['variance_rounds'] / num_games) < Z_BOUND
+
+
+@pytest.mark.skipif('numba' not in BACKENDS, reason="Numba is not installed")
+def test_numba_replays_reference():
+    """Numba kernels draw from the caller's Generator exactly like the reference loop."""
+    for kernel in ('batch', 'capital_batch'):
+        args = (6, 3, 0.7, 200, MAX_ROUNDS) if kernel == 'batch' else (6, 3, 0.7, 7, 200)
+        reference = getattr(get_backend('reference'), kernel)(*args, np.random.default_rng(5))
+        numba = getattr(get_backend('numba'), kernel)(*args, np.random.default_rng(5))
+        for expected, actual in zip(np.atleast_2d(reference), np.atleast_2d(numba)):
+            np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,28 @@
+"""
+Gambler's Ruin Problem - Importance Sampling of P(ruin of A)
+The weighted estimate must match theoretical_P_ruin_A within its own
+standard error on both sides of the fair game; seeds are fixed, so the
+tests are deterministic
+
+Usage (from tasks1/):
+    python -m pytest -q test_importance_sampling.py
+"""
+
+import pytest
+from gambler_ruin import simulate_ruin_importance_sampling, theoretical_P_ruin_A
+
+# Rare ruin (pA > 0.5, tilted), near-certain ruin (pA < 0.5, plain Monte Carlo) and the fair game
+GAMES = (50, 50, 0.7), (6, 3, 0.7), (20, 20, 0.6), (5, 5, 0.5), (4, 8, 0.45), (50, 50, 0.3), (10, 5, 0.4)
+NUM_SIMULATIONS = 4000
+Z_BOUND = 4.5
+
+
+@pytest.mark.parametrize('game', GAMES)
+def test_matches_theory(game):
+    a, b, pA = game
+    result = simulate_ruin_importance_sampling(a, b, pA, NUM_SIMULATIONS, seed=a + b)
+    exact = theoretical_P_ruin_A(a, b, pA)
+    # An outcome rarer than ~1/NUM_SIMULATIONS under the sampling drift may never be
+    # observed, leaving std_error at 0; it shifts the estimate by about that fraction
+    assert abs(result['P_ruin_A'] - exact) <= Z_BOUND * (result['std_error'] + exact / NUM_SIMULATIONS)
+    assert result['ess'] > 0